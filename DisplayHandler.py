@@ -1,13 +1,30 @@
+import threading
 import time
-import RPi.GPIO as GPIO
+from contextlib import contextmanager
+import numpy as np
+
+from color import pack_pixels
+from const import PixelFormat
+from display_list import DisplayList
+from tracing import tracer
+
+# Pin levels, as taken by both GPIO backends
+LOW = 0
+HIGH = 1
 
 
 class DisplayHandler:
-    def __init__(self, gpio_handler, spi_handler, commands):
+    def __init__(
+        self, gpio_handler, spi_handler, commands, pixel_format=PixelFormat.RGB565
+    ):
         self.gpio = gpio_handler
         self.spi = spi_handler
         self.commands = commands
 
+        # Interface pixel format (COLMOD value); smaller formats trade color
+        # depth for fewer bytes per frame
+        self.pixel_format = pixel_format
+
         # Pin definitions
         self.LCD_RS = self.gpio.rs_pin
         self.LCD_CS = self.gpio.cs_pin
@@ -20,70 +37,139 @@ class DisplayHandler:
         # Lock from SPI handler if present
         self.spi_lock = getattr(self.spi, "spi_lock", None)
 
+        # Held while CS is low so the touch controller can't use the bus
+        self.bus_lock = getattr(self.spi, "bus_lock", None) or threading.RLock()
+
+        # DisplayList being recorded, per thread: while set, that thread's
+        # drawing is captured instead of sent; other threads draw as usual
+        self._recorder = threading.local()
+
+    @property
+    def _recording(self):
+        return getattr(self._recorder, "display_list", None)
+
+    def _select(self, rs):
+        """Set DC and pull CS low, in one call where the backend supports it."""
+        if hasattr(self.gpio, "set_pins"):
+            self.gpio.set_pins({self.LCD_RS: rs, self.LCD_CS: LOW})
+        else:
+            self.gpio.set_pin(self.LCD_RS, rs)
+            self.gpio.set_pin(self.LCD_CS, LOW)
+
     def send_command(self, cmd):
         """Send a command to the display."""
-        self.gpio.set_pin(self.LCD_RS, GPIO.LOW)  # Command mode
-        self.gpio.set_pin(self.LCD_CS, GPIO.LOW)
-        self.spi.write([cmd])
-        self.gpio.set_pin(self.LCD_CS, GPIO.HIGH)
+        if self._recording is not None:
+            self._recording.add(False, [cmd])
+            return
+
+        with self.bus_lock:
+            # Command mode + select
+            with tracer.span("gpio.select", "gpio"):
+                self._select(LOW)
+            self.spi.write([cmd])
+            with tracer.span("gpio.deselect", "gpio"):
+                self.gpio.set_pin(self.LCD_CS, HIGH)
 
     def send_data(self, data):
         """Send data to the display."""
-        self.gpio.set_pin(self.LCD_RS, GPIO.HIGH)  # Data mode
-        self.gpio.set_pin(self.LCD_CS, GPIO.LOW)
+        if self._recording is not None:
+            self._recording.add(True, data if not isinstance(data, int) else [data])
+            return
 
-        if isinstance(data, list):
-            self.spi.write(data)
-        else:
-            self.spi.write([data])
+        with self.bus_lock:
+            # Data mode + select
+            with tracer.span("gpio.select", "gpio"):
+                self._select(HIGH)
+
+            if isinstance(data, (list, bytes, bytearray, memoryview)):
+                self.spi.write(data)
+            else:
+                self.spi.write([data])
 
-        self.gpio.set_pin(self.LCD_CS, GPIO.HIGH)
+            with tracer.span("gpio.deselect", "gpio"):
+                self.gpio.set_pin(self.LCD_CS, HIGH)
 
-    def init_display(self):
-        """Initialize the display with required settings."""
-        # Reset display first
-        self.gpio.set_pin(self.LCD_RST, GPIO.LOW)
-        time.sleep(0.1)
-        self.gpio.set_pin(self.LCD_RST, GPIO.HIGH)
-        time.sleep(0.1)
+    def read_register(self, cmd, length=1):
+        """Send a read command and return `length` bytes clocked back out."""
+        if self._recording is not None:
+            raise RuntimeError("Cannot read from the panel while recording")
+        with self.bus_lock:
+            self._select(LOW)
+            self.spi.write([cmd])
+            # Keep CS asserted; the response is clocked out in data mode, at
+            # the slow read clock whatever the (possibly tuned) write speed is
+            self.gpio.set_pin(self.LCD_RS, HIGH)
+            result = self.spi.read([0x00] * length, speed=self.commands.READ_SPEED)
+            self.gpio.set_pin(self.LCD_CS, HIGH)
+        return result or []
 
-        # Software reset
-        self.send_command(self.commands.CMD_SWRESET)
-        time.sleep(0.1)
+    def is_configured(self):
+        """Check via register readback whether the panel is already set up."""
+        try:
+            power_mode = self.read_register(self.commands.CMD_RDDPM)
+            madctl = self.read_register(self.commands.CMD_RDDMADCTL)
+            colmod = self.read_register(self.commands.CMD_RDDCOLMOD)
+        except Exception as e:
+            print(f"Register readback failed: {e}")
+            return False
 
-        # Exit sleep mode
-        self.send_command(self.commands.CMD_SLPOUT)
-        time.sleep(0.1)
+        if not (power_mode and madctl and colmod):
+            return False
 
-        # Set color mode
-        self.send_command(self.commands.CMD_COLMOD)
+        awake = self.commands.PM_SLEEP_OUT | self.commands.PM_DISPLAY_ON
+        return (
+            power_mode[0] & awake == awake
+            and madctl[0] == self.commands.MADCTL_VALUE
+            # Only the MCU interface bits are meaningful over SPI
+            and colmod[0] & 0x07 == self.pixel_format & 0x07
+        )
 
-        # Set memory access control
-        self.send_command(self.commands.CMD_MADCTL)
-        self.send_data(0xC0)  # Match the working configuration
+    def init_display(self, warm=False):
+        """
+        Initialize the display with required settings.
 
-        # Turn on display
-        self.send_command(self.commands.CMD_DISPON)
-        time.sleep(0.1)
+        With warm=True the panel registers are read back first and, if the
+        panel is already awake and configured (e.g. after a service restart),
+        reset and sleep-out are skipped. Returns True if the warm path was taken.
+        """
+        if warm and self.is_configured():
+            print("Display already configured, skipping init")
+            return True
 
-        # Set color mode to 16-bit (565 RGB)
-        self.send_command(self.commands.CMD_COLMOD)
-        self.send_data(0x55)  # 16-bit color
-        time.sleep(0.1)
+        # Hardware reset
+        self.gpio.set_pin(self.LCD_RST, LOW)
+        time.sleep(self.commands.RESET_LOW_TIME)
+        self.gpio.set_pin(self.LCD_RST, HIGH)
+        time.sleep(self.commands.RESET_RECOVERY_TIME)
+
+        for cmd, data, delay in self.commands.INIT_SEQUENCE:
+            if cmd == self.commands.CMD_COLMOD:
+                # Placeholder step; the interface format is per display
+                data = [self.pixel_format]
+            self.send_command(cmd)
+            if data is not None:
+                self.send_data(data)
+            if delay:
+                time.sleep(delay)
+        return False
 
     def set_address_window(self, x0, y0, x1, y1):
         """Set the address window for drawing."""
-        # Column address set
-        self.send_command(self.commands.CMD_CASET)
-        self.send_data([0x00, x0, 0x00, x1])  # Start and end column
-
-        # Row address set
-        self.send_command(self.commands.CMD_RASET)
-        self.send_data([0x00, y0, 0x00, y1])  # Start and end row
+        self._set_window(x0, y0, x1, y1)
 
         # Write to RAM
         self.send_command(self.commands.CMD_RAMWR)
 
+    def _set_window(self, x0, y0, x1, y1):
+        """Send CASET/RASET for a window without starting a memory access."""
+        # Column address set (start and end column, 16-bit big-endian)
+        self.send_command(self.commands.CMD_CASET)
+        self.send_data([x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF])
+
+        # Row address set (rows go up to 319, so the high byte matters)
+        self.send_command(self.commands.CMD_RASET)
+        self.send_data([y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF])
+
     def fill_screen(self, color):
         """Fill the entire screen with a single color."""
         # Set address window to entire screen
@@ -95,17 +181,16 @@ class DisplayHandler:
 
         self.send_command(self.commands.CMD_RAMWR)
 
-        # Create color bytes (high byte, low byte pattern)
-        high_byte = (color >> 8) & 0xFF
-        low_byte = color & 0xFF
+        # One buffer for the whole screen; SPIHandler splits it into transfers
+        self.send_data(self.solid_color(color, self.width * self.height))
 
-        # Calculate pixel count for entire screen
-        pixels = [high_byte, low_byte] * (self.width * self.height)
-
-        # Send in chunks to avoid buffer issues
-        chunk_size = 4096
-        for i in range(0, len(pixels), chunk_size):
-            self.send_data(pixels[i : i + chunk_size])
+    def solid_color(self, color, count):
+        """Return `count` pixels of one color packed in the wire format."""
+        # Two pixels is the smallest whole unit in every format (3 bytes in 12-bit)
+        data = pack_pixels([color, color], self.pixel_format) * (count // 2)
+        if count % 2:
+            data += pack_pixels([color], self.pixel_format)
+        return data
 
     def draw_pixel(self, x, y, color):
         """Draw a single pixel at the specified position."""
@@ -116,6 +201,85 @@ class DisplayHandler:
         self.set_address_window(x, y, x, y)
 
         # Send color
-        high_byte = (color >> 8) & 0xFF
-        low_byte = color & 0xFF
-        self.send_data([high_byte, low_byte])
+        self.send_data(pack_pixels([color], self.pixel_format))
+
+    def fill_rect(self, x, y, w, h, color):
+        """Fill a rectangle with one color using a single windowed write."""
+        # Clip to the screen
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        with tracer.span("display.fill_rect", "display"):
+            self.set_address_window(x0, y0, x1 - 1, y1 - 1)
+            self.send_data(self.solid_color(color, (x1 - x0) * (y1 - y0)))
+
+    def read_memory(self, x, y, w, h):
+        """
+        Read a w x h window of frame memory back with RAMRD.
+
+        Returns a list of 3 bytes per pixel (6-bit channels, left-aligned),
+        which is how the controller reports pixels regardless of COLMOD.
+        """
+        self._set_window(x, y, x + w - 1, y + h - 1)
+        # The first byte clocked out after RAMRD is a dummy read
+        data = self.read_register(self.commands.CMD_RAMRD, 1 + w * h * 3)
+        return list(data[1:])
+
+    def draw_buffer(self, x, y, w, h, buffer):
+        """
+        Write a pre-encoded buffer of wire-format pixels to a w x h window.
+
+        The buffer (bytes, bytearray, memoryview or mmap slice) is sent as-is,
+        so callers holding frames in panel byte order pay only bus time.
+        """
+        self.set_address_window(x, y, x + w - 1, y + h - 1)
+        self.send_data(buffer)
+
+    def blit(self, x, y, pixels):
+        """
+        Draw a 2-D array of RGB565 values with its top-left corner at (x, y).
+
+        The array is packed into the selected wire format with NumPy before
+        it is sent, so any frame source can drive any pixel format.
+        """
+        pixels = np.asarray(pixels, dtype=np.uint16)
+        h, w = pixels.shape
+        with tracer.span("display.pack", "display"):
+            data = pack_pixels(pixels, self.pixel_format)
+        with tracer.span("display.blit", "display"):
+            self.draw_buffer(x, y, w, h, data)
+
+    @contextmanager
+    def record(self):
+        """
+        Record drawing calls made in the block by this thread into a
+        DisplayList instead of sending them:
+
+            with display.record() as splash:
+                display.fill_screen(Colors.BLACK)
+                display.blit(40, 100, logo)
+            display.replay(splash)
+        """
+        display_list = DisplayList(self.pixel_format)
+        self._recorder.display_list = display_list
+        try:
+            yield display_list
+        finally:
+            self._recorder.display_list = None
+
+    def _set_mode(self, is_data):
+        self.gpio.set_pin(self.LCD_RS, HIGH if is_data else LOW)
+
+    def replay(self, display_list):
+        """Send a recorded DisplayList as one streamed SPI task."""
+        if display_list.pixel_format != self.pixel_format:
+            raise ValueError("Display list was recorded for another pixel format")
+
+        with self.bus_lock, tracer.span("display.replay", "display"):
+            self.gpio.set_pin(self.LCD_CS, LOW)
+            try:
+                self.spi.write_stream(display_list.segments, self._set_mode)
+            finally:
+                self.gpio.set_pin(self.LCD_CS, HIGH)
@@ -25,5 +25,9 @@ class GPIOHandler:
     def set_pin(self, pin, value):
         GPIO.output(pin, value)
 
+    def set_pins(self, values):
+        """Set several pins in one call, e.g. {rs_pin: 0, cs_pin: 0}."""
+        GPIO.output(list(values.keys()), list(values.values()))
+
     def cleanup(self):
         GPIO.cleanup()
@@ -0,0 +1,282 @@
+import ctypes
+import fcntl
+import os
+import select
+import struct
+
+# GPIO Pin Definitions (line offsets, same as BCM numbers on the Pi)
+LCD_CS = 8  # Chip Select
+LCD_RS = 22  # Command/Data (DC)
+LCD_RST = 27  # Reset
+
+# GPIO character device uAPI v2 (linux/gpio.h)
+GPIO_MAX_NAME_SIZE = 32
+GPIO_V2_LINES_MAX = 64
+GPIO_V2_LINE_NUM_ATTRS_MAX = 10
+
+GPIO_V2_LINE_FLAG_INPUT = 1 << 2
+GPIO_V2_LINE_FLAG_OUTPUT = 1 << 3
+GPIO_V2_LINE_FLAG_EDGE_RISING = 1 << 4
+GPIO_V2_LINE_FLAG_EDGE_FALLING = 1 << 5
+GPIO_V2_LINE_FLAG_BIAS_PULL_UP = 1 << 8
+GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN = 1 << 9
+
+GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES = 2
+GPIO_V2_LINE_ATTR_ID_DEBOUNCE = 3
+
+GPIO_V2_LINE_EVENT_RISING_EDGE = 1
+GPIO_V2_LINE_EVENT_FALLING_EDGE = 2
+
+
+class _LineAttribute(ctypes.Structure):
+    _fields_ = [
+        ("id", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32),
+        ("values", ctypes.c_uint64),  # union of flags/values/debounce_period_us
+    ]
+
+
+class _LineConfigAttribute(ctypes.Structure):
+    _fields_ = [
+        ("attr", _LineAttribute),
+        ("mask", ctypes.c_uint64),
+    ]
+
+
+class _LineConfig(ctypes.Structure):
+    _fields_ = [
+        ("flags", ctypes.c_uint64),
+        ("num_attrs", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32 * 5),
+        ("attrs", _LineConfigAttribute * GPIO_V2_LINE_NUM_ATTRS_MAX),
+    ]
+
+
+class _LineRequest(ctypes.Structure):
+    _fields_ = [
+        ("offsets", ctypes.c_uint32 * GPIO_V2_LINES_MAX),
+        ("consumer", ctypes.c_char * GPIO_MAX_NAME_SIZE),
+        ("config", _LineConfig),
+        ("num_lines", ctypes.c_uint32),
+        ("event_buffer_size", ctypes.c_uint32),
+        ("padding", ctypes.c_uint32 * 5),
+        ("fd", ctypes.c_int32),
+    ]
+
+
+class _LineValues(ctypes.Structure):
+    _fields_ = [
+        ("bits", ctypes.c_uint64),
+        ("mask", ctypes.c_uint64),
+    ]
+
+
+def _iowr(nr, size):
+    return (3 << 30) | (size << 16) | (0xB4 << 8) | nr
+
+
+GPIO_V2_GET_LINE_IOCTL = _iowr(0x07, ctypes.sizeof(_LineRequest))
+GPIO_V2_LINE_GET_VALUES_IOCTL = _iowr(0x0E, ctypes.sizeof(_LineValues))
+GPIO_V2_LINE_SET_VALUES_IOCTL = _iowr(0x0F, ctypes.sizeof(_LineValues))
+
+# struct gpio_v2_line_event: timestamp_ns, id, offset, seqno, line_seqno, padding[6]
+_LINE_EVENT = struct.Struct("=QIIII24x")
+
+
+class LineRequest:
+    """A set of lines requested together; values are read/written in one ioctl."""
+
+    def __init__(
+        self,
+        chip_fd,
+        offsets,
+        flags,
+        values=None,
+        debounce_us=0,
+        consumer="lcddriver",
+    ):
+        self.offsets = list(offsets)
+        self.index = {offset: i for i, offset in enumerate(offsets)}
+        self._values = _LineValues()
+
+        req = _LineRequest()
+        for i, offset in enumerate(offsets):
+            req.offsets[i] = offset
+        req.num_lines = len(offsets)
+        req.consumer = consumer.encode()[: GPIO_MAX_NAME_SIZE - 1]
+        req.config.flags = flags
+
+        attrs = 0
+        if values:
+            bits, mask = self._pack(values)
+            attr = req.config.attrs[attrs]
+            attr.attr.id = GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES
+            attr.attr.values = bits
+            attr.mask = mask
+            attrs += 1
+        if debounce_us:
+            attr = req.config.attrs[attrs]
+            attr.attr.id = GPIO_V2_LINE_ATTR_ID_DEBOUNCE
+            attr.attr.values = debounce_us
+            attr.mask = (1 << len(offsets)) - 1
+            attrs += 1
+        req.config.num_attrs = attrs
+
+        fcntl.ioctl(chip_fd, GPIO_V2_GET_LINE_IOCTL, req)
+        self.fd = req.fd
+
+    def _pack(self, values):
+        """Turn a {offset: value} mapping into (bits, mask) for this request."""
+        bits = 0
+        mask = 0
+        for offset, value in values.items():
+            bit = 1 << self.index[offset]
+            mask |= bit
+            if value:
+                bits |= bit
+        return bits, mask
+
+    def set_values(self, values):
+        """Set several lines at once with a single SET_VALUES ioctl."""
+        self._values.bits, self._values.mask = self._pack(values)
+        fcntl.ioctl(self.fd, GPIO_V2_LINE_SET_VALUES_IOCTL, self._values)
+
+    def get_value(self, offset):
+        """Read the current level of a single line."""
+        bit = 1 << self.index[offset]
+        self._values.bits = 0
+        self._values.mask = bit
+        fcntl.ioctl(self.fd, GPIO_V2_LINE_GET_VALUES_IOCTL, self._values)
+        return 1 if self._values.bits & bit else 0
+
+    def fileno(self):
+        return self.fd
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class EdgeEventLine(LineRequest):
+    """Input line with edge detection; events are read from the request fd."""
+
+    def __init__(
+        self,
+        chip_fd,
+        offset,
+        rising=False,
+        falling=True,
+        pull_up=True,
+        debounce_us=0,
+    ):
+        flags = GPIO_V2_LINE_FLAG_INPUT
+        if rising:
+            flags |= GPIO_V2_LINE_FLAG_EDGE_RISING
+        if falling:
+            flags |= GPIO_V2_LINE_FLAG_EDGE_FALLING
+        if pull_up:
+            flags |= GPIO_V2_LINE_FLAG_BIAS_PULL_UP
+        super().__init__(chip_fd, [offset], flags, debounce_us=debounce_us)
+        self.offset = offset
+
+    def wait(self, timeout=None):
+        """Wait until an edge event is pending. Returns False on timeout."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def read_events(self):
+        """Read all pending events as (timestamp_ns, falling) tuples."""
+        data = os.read(self.fd, _LINE_EVENT.size * 16)
+        events = []
+        for pos in range(0, len(data) - _LINE_EVENT.size + 1, _LINE_EVENT.size):
+            timestamp_ns, event_id, _, _, _ = _LINE_EVENT.unpack_from(data, pos)
+            events.append((timestamp_ns, event_id == GPIO_V2_LINE_EVENT_FALLING_EDGE))
+        return events
+
+    def read(self):
+        return self.get_value(self.offset)
+
+
+class GpiodHandler:
+    """
+    GPIO backend on the Linux GPIO character device (/dev/gpiochipN).
+
+    Drop-in replacement for GPIOHandler. The LCD control lines are held in a
+    single line request so DC and CS can be changed together with one ioctl.
+    Pin numbers are line offsets on the chip, which match BCM numbers on the
+    Raspberry Pi's main GPIO chip. Works against gpio-sim/gpio-mockup chips too.
+    """
+
+    def __init__(
+        self,
+        cs_pin=LCD_CS,
+        rs_pin=LCD_RS,
+        rst_pin=LCD_RST,
+        chip="/dev/gpiochip0",
+    ):
+        self.cs_pin = cs_pin
+        self.rs_pin = rs_pin
+        self.rst_pin = rst_pin
+
+        self.chip_fd = os.open(chip, os.O_RDWR | os.O_CLOEXEC)
+        self.requests = {}  # pin -> LineRequest owning it
+        self.edge_lines = []
+
+        pins = [self.cs_pin, self.rs_pin, self.rst_pin]
+        self._request_outputs(pins, {pin: 1 for pin in pins})
+
+    def _request_outputs(self, pins, initial):
+        request = LineRequest(
+            self.chip_fd, pins, GPIO_V2_LINE_FLAG_OUTPUT, values=initial
+        )
+        for pin in pins:
+            self.requests[pin] = request
+        return request
+
+    def setup_output(self, pin, initial=1):
+        """Request an extra output line (e.g. the touch controller CS)."""
+        if pin not in self.requests:
+            self._request_outputs([pin], {pin: initial})
+
+    def set_pin(self, pin, value):
+        self.requests[pin].set_values({pin: value})
+
+    def set_pins(self, values):
+        """Set several pins; pins sharing a line request take a single ioctl."""
+        grouped = {}
+        for pin, value in values.items():
+            grouped.setdefault(self.requests[pin], {})[pin] = value
+        for request, request_values in grouped.items():
+            request.set_values(request_values)
+
+    def request_edge_events(
+        self,
+        pin,
+        rising=False,
+        falling=True,
+        pull_up=True,
+        debounce_us=0,
+    ):
+        """Request an input line with edge detection and return it."""
+        line = EdgeEventLine(
+            self.chip_fd,
+            pin,
+            rising=rising,
+            falling=falling,
+            pull_up=pull_up,
+            debounce_us=debounce_us,
+        )
+        self.edge_lines.append(line)
+        return line
+
+    def cleanup(self):
+        for request in set(self.requests.values()):
+            request.close()
+        for line in self.edge_lines:
+            line.close()
+        self.requests = {}
+        self.edge_lines = []
+        if self.chip_fd >= 0:
+            os.close(self.chip_fd)
+            self.chip_fd = -1
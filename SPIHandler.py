@@ -1,10 +1,15 @@
 import spidev
 import threading
+import time
 from queue import Queue
 
+from tracing import tracer
+
 
 class SPIHandler:
     def __init__(self, bus=0, device=0, max_speed=10_000_000):
+        self.bus = bus
+        self.device = device
         self.spi = spidev.SpiDev()
         self.spi.open(bus, device)
         self.spi.max_speed_hz = max_speed
@@ -13,6 +18,10 @@ class SPIHandler:
         self.spi_queue = Queue()  # Task queue for SPI transactions
         self.spi_lock = threading.Lock()  # Ensure only one SPI transfer at a time
 
+        # Devices sharing the bus (LCD, touch) hold this from CS low to CS high
+        # so their transactions never interleave
+        self.bus_lock = threading.RLock()
+
         self.spi_worker_thread = threading.Thread(target=self.spi_worker, daemon=True)
         self.spi_worker_thread.start()
 
@@ -22,50 +31,107 @@ class SPIHandler:
             task = self.spi_queue.get()
             if task is None:  # Stop condition
                 break
-            with self.spi_lock:
-                if task["type"] == "write":
-                    data = task["data"]
-                    if isinstance(data, (bytes, bytearray)):
-                        data = list(data)
-                    elif isinstance(data, int):
-                        data = [data]
-                    elif isinstance(data, list):
-                        data = [int(x) for x in data]
-                    else:
-                        raise ValueError("Invalid data type for SPI write")
-                    if data:  # Only transfer non-empty data list
-                        self.spi.xfer2(data)
-                    else:
-                        print("Empty data list for SPI write")
-                elif task["type"] == "read":
-                    # Ensure data is a non-empty list and convert if needed
-                    data = task["data"]
-                    if isinstance(data, (bytes, bytearray)):
-                        data = list(data)
-                    elif isinstance(data, int):
-                        data = [data]
-                    elif isinstance(data, list):
-                        data = [int(x) for x in data]
-                    else:
-                        raise ValueError("Invalid data type for SPI read")
-                    if data:
-                        task["result"].append(self.spi.xfer2(data))
-                    else:
-                        task["result"].append([])
-            self.spi_queue.task_done()
+            queued = task.get("queued")
+            if queued:
+                # Time the task sat in spi_queue before this thread got to it
+                tracer.record(
+                    "spi.queue_wait", "spi", queued, time.perf_counter_ns() - queued
+                )
+            try:
+                self._run_task(task)
+            except Exception as e:
+                # Handed back to the caller; the worker keeps serving the queue
+                task["error"] = e
+            finally:
+                self.spi_queue.task_done()
+
+    def _run_task(self, task):
+        """Carry out one queued transfer; runs on the worker thread."""
+        with self.spi_lock, tracer.span("spi.xfer", "spi"):
+            if task["type"] == "stream":
+                # Display list replay: DC changes between segments happen
+                # here, so the whole list is a single queued task
+                set_mode = task["set_mode"]
+                for is_data, data in task["segments"]:
+                    set_mode(is_data)
+                    self.spi.writebytes2(data)
+            elif task["type"] == "write" and isinstance(
+                task["data"], (bytes, bytearray, memoryview)
+            ):
+                # Buffers go out as-is; writebytes2 splits them into
+                # bufsiz-sized transfers without building int lists
+                if len(task["data"]):
+                    self.spi.writebytes2(task["data"])
+            elif task["type"] == "write":
+                data = task["data"]
+                if isinstance(data, int):
+                    data = [data]
+                elif isinstance(data, list):
+                    data = [int(x) for x in data]
+                else:
+                    raise ValueError("Invalid data type for SPI write")
+                if data:  # Only transfer non-empty data list
+                    self.spi.xfer2(data)
+                else:
+                    print("Empty data list for SPI write")
+            elif task["type"] == "read":
+                # Ensure data is a non-empty list and convert if needed
+                data = task["data"]
+                if isinstance(data, (bytes, bytearray)):
+                    data = list(data)
+                elif isinstance(data, int):
+                    data = [data]
+                elif isinstance(data, list):
+                    data = [int(x) for x in data]
+                else:
+                    raise ValueError("Invalid data type for SPI read")
+                if data and task.get("speed"):
+                    task["result"].append(self.spi.xfer2(data, task["speed"]))
+                elif data:
+                    task["result"].append(self.spi.xfer2(data))
+                else:
+                    task["result"].append([])
+
+    def _submit(self, task):
+        """Queue a task, wait for the worker and re-raise anything it raised."""
+        if tracer.enabled:
+            task["queued"] = time.perf_counter_ns()
+        self.spi_queue.put(task)
+        self.spi_queue.join()  # Wait for task completion
+        if "error" in task:
+            raise task["error"]
 
     def write(self, data):
         """Queues a write operation."""
-        self.spi_queue.put({"type": "write", "data": data})
-        self.spi_queue.join()
+        with tracer.span("spi.write", "spi"):
+            self._submit({"type": "write", "data": data})
+
+    def write_stream(self, segments, set_mode):
+        """
+        Queue a list of (is_data, bytes) segments as one task. set_mode(is_data)
+        is called before each segment to switch the DC line.
+        """
+        with tracer.span("spi.stream", "spi"):
+            self._submit({"type": "stream", "segments": segments, "set_mode": set_mode})
 
-    def read(self, data):
-        """Queues a read operation and returns the result."""
+    def read(self, data, speed=None):
+        """
+        Queues a read operation and returns the result. `speed` sets the clock
+        for this transfer only; None uses the bus speed.
+        """
         result = []
-        self.spi_queue.put({"type": "read", "data": data, "result": result})
-        self.spi_queue.join()  # Wait for task completion
+        with tracer.span("spi.read", "spi"):
+            self._submit(
+                {"type": "read", "data": data, "result": result, "speed": speed}
+            )
         return result[0] if result else None  # Return received SPI data
 
+    def set_speed(self, speed):
+        """Change the SPI clock between transfers."""
+        self.spi_queue.join()  # Let queued transfers finish at the old speed
+        with self.spi_lock:
+            self.spi.max_speed_hz = int(speed)
+
     def close(self):
         """Clean up SPI resources."""
         self.spi_queue.put(None)  # Stop worker thread
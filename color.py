@@ -0,0 +1,78 @@
+import numpy as np
+
+from const import PixelFormat
+
+
+def rgb_to_rgb565(rgb):
+    """
+    Convert an (..., 3) uint8 RGB array to RGB565 values.
+
+    Uses the same channel layout as const.Colors (red in the low bits,
+    blue in the high bits), matching the panel's MADCTL setting.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint16)
+    r = rgb[..., 0] >> 3
+    g = rgb[..., 1] >> 2
+    b = rgb[..., 2] >> 3
+    return (b << 11) | (g << 5) | r
+
+
+def rgb565_to_rgb(pixels):
+    """Expand RGB565 values back to an (..., 3) uint8 RGB array."""
+    pixels = np.asarray(pixels, dtype=np.uint16)
+    r = pixels & 0x1F
+    g = (pixels >> 5) & 0x3F
+    b = pixels >> 11
+    rgb = np.empty(pixels.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = (r << 3) | (r >> 2)
+    rgb[..., 1] = (g << 2) | (g >> 4)
+    rgb[..., 2] = (b << 3) | (b >> 2)
+    return rgb
+
+
+def wire_size(pixel_count, pixel_format=PixelFormat.RGB565):
+    """Number of bytes `pixel_count` pixels take on the wire."""
+    if pixel_format == PixelFormat.RGB565:
+        return pixel_count * 2
+    if pixel_format == PixelFormat.RGB666:
+        return pixel_count * 3
+    if pixel_format == PixelFormat.RGB444:
+        return (pixel_count * 3 + 1) // 2
+    raise ValueError(f"Unsupported pixel format: 0x{pixel_format:02X}")
+
+
+def pack_pixels(pixels, pixel_format=PixelFormat.RGB565):
+    """
+    Pack RGB565 values (any shape, row-major) into wire-format bytes.
+
+    RGB565 goes out big-endian, RGB666 as three left-aligned 6-bit bytes per
+    pixel and RGB444 as two pixels per three bytes. Odd RGB444 runs end with
+    a padded half-word, which the controller discards.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint16).ravel()
+
+    if pixel_format == PixelFormat.RGB565:
+        return pixels.astype(">u2").tobytes()
+
+    if pixel_format == PixelFormat.RGB666:
+        out = np.empty((pixels.size, 3), dtype=np.uint8)
+        out[:, 0] = (pixels >> 11) << 3
+        out[:, 1] = ((pixels >> 5) & 0x3F) << 2
+        out[:, 2] = (pixels & 0x1F) << 3
+        return out.tobytes()
+
+    if pixel_format == PixelFormat.RGB444:
+        count = pixels.size
+        if count % 2:
+            pixels = np.append(pixels, np.uint16(0))
+        # Top 4 bits of each channel, in wire order
+        c0 = ((pixels >> 12) & 0xF).astype(np.uint8)
+        c1 = ((pixels >> 7) & 0xF).astype(np.uint8)
+        c2 = ((pixels >> 1) & 0xF).astype(np.uint8)
+        out = np.empty((pixels.size // 2, 3), dtype=np.uint8)
+        out[:, 0] = (c0[0::2] << 4) | c1[0::2]
+        out[:, 1] = (c2[0::2] << 4) | c0[1::2]
+        out[:, 2] = (c1[1::2] << 4) | c2[1::2]
+        return out.tobytes()[: wire_size(count, pixel_format)]
+
+    raise ValueError(f"Unsupported pixel format: 0x{pixel_format:02X}")
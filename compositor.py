@@ -0,0 +1,145 @@
+import threading
+
+import numpy as np
+
+from color import rgb565_to_rgb, rgb_to_rgb565
+from rects import intersect_rects, merge_rects
+
+
+class Layer:
+    """
+    RGBA overlay (uint8, straight alpha) with a position and an opacity.
+
+    Moving it, changing its opacity or calling update() after drawing into
+    `rgba` damages only the screen area involved.
+    """
+
+    def __init__(self, width, height, x=0, y=0, opacity=1.0):
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self.opacity = opacity
+        self.visible = True
+        self.rgba = np.zeros((height, width, 4), dtype=np.uint8)
+        self.compositor = None
+
+    @property
+    def rect(self):
+        return self.x, self.y, self.width, self.height
+
+    def _damage(self, rect=None):
+        if self.compositor is not None:
+            self.compositor.invalidate(rect or self.rect)
+
+    def update(self, rect=None):
+        """Mark layer content as changed; `rect` is in layer coordinates."""
+        if rect is None:
+            self._damage()
+        else:
+            x, y, w, h = rect
+            self._damage((self.x + x, self.y + y, w, h))
+
+    def move(self, x, y):
+        if (x, y) != (self.x, self.y):
+            self._damage()
+            self.x, self.y = x, y
+            self._damage()
+
+    def set_opacity(self, opacity):
+        opacity = max(0.0, min(opacity, 1.0))
+        if opacity != self.opacity:
+            self.opacity = opacity
+            self._damage()
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self._damage()
+
+    def fill(self, rgba):
+        """Fill the whole layer with one (r, g, b, a) color."""
+        self.rgba[:] = rgba
+        self._damage()
+
+
+class Compositor:
+    """
+    Blends RGBA overlay layers over an RGB565 base image.
+
+    Changes to the base or any layer are collected as damage rects. flush()
+    composites only those rects with vectorized integer blending and sends
+    them to the display, so a moving cursor or fading popup costs a small
+    write instead of a full frame.
+    """
+
+    def __init__(self, display, base=None):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        if base is None:
+            base = np.zeros((self.height, self.width), dtype=np.uint16)
+        self.base = base
+        self.layers = []  # Bottom to top
+        self.damage = [(0, 0, self.width, self.height)]
+        self.lock = threading.Lock()
+
+    def add_layer(self, layer):
+        with self.lock:
+            layer.compositor = self
+            self.layers.append(layer)
+        layer.update()
+        return layer
+
+    def remove_layer(self, layer):
+        with self.lock:
+            self.layers.remove(layer)
+            layer.compositor = None
+        self.invalidate(layer.rect)
+
+    def invalidate(self, rect=None):
+        """Mark a screen rect (default: everything) for recompositing."""
+        bounds = (0, 0, self.width, self.height)
+        rect = intersect_rects(rect or bounds, bounds)
+        if rect:
+            with self.lock:
+                self.damage.append(rect)
+
+    def update_base(self, rect=None):
+        """Call after drawing into `base`."""
+        self.invalidate(rect)
+
+    def compose(self, rect):
+        """Composite one screen rect and return it as RGB565."""
+        x, y, w, h = rect
+        out = rgb565_to_rgb(self.base[y : y + h, x : x + w]).astype(np.uint16)
+
+        for layer in self.layers:
+            if not layer.visible or layer.opacity <= 0:
+                continue
+            overlap = intersect_rects(rect, layer.rect)
+            if overlap is None:
+                continue
+            ox, oy, ow, oh = overlap
+            src = layer.rgba[
+                oy - layer.y : oy - layer.y + oh, ox - layer.x : ox - layer.x + ow
+            ].astype(np.uint16)
+            dst = out[oy - y : oy - y + oh, ox - x : ox - x + ow]
+
+            # Effective alpha 0-255 from per-pixel alpha and layer opacity
+            opacity = int(round(layer.opacity * 255))
+            alpha = (src[..., 3:4] * opacity + 127) // 255
+            dst[:] = (src[..., :3] * alpha + dst * (255 - alpha) + 127) // 255
+
+        return rgb_to_rgb565(out)
+
+    def flush(self):
+        """Composite and send the damaged rects. Returns the rects written."""
+        with self.lock:
+            rects = merge_rects(self.damage)
+            self.damage = []
+            tiles = [(rect, self.compose(rect)) for rect in rects]
+
+        for (x, y, _, _), tile in tiles:
+            self.display.blit(x, y, tile)
+        return rects
@@ -9,8 +9,17 @@ class ILI9340:
         CMD_CASET (int): Column Address Set command (0x2A).
         CMD_RASET (int): Row Address Set command (0x2B).
         CMD_RAMWR (int): Write to Memory command (0x2C).
+        CMD_RAMRD (int): Read from Memory command (0x2E).
         CMD_COLMOD (int): Set Pixel Format command (0x3A).
         CMD_MADCTL (int): Memory Access Control command (0x36).
+        CMD_RDDPM (int): Read Display Power Mode command (0x0A).
+        CMD_RDDMADCTL (int): Read Display MADCTL command (0x0B).
+        CMD_RDDCOLMOD (int): Read Display Pixel Format command (0x0C).
+        INIT_SEQUENCE (tuple): (command, data, delay in seconds) steps run by
+            DisplayHandler.init_display after the hardware reset. Delays are
+            the datasheet minimums before the next command may be sent. The
+            COLMOD step has no data here; init_display sends the display's
+            pixel_format.
     """
 
     CMD_SWRESET = 0x01  # Software Reset
@@ -19,8 +28,50 @@ class ILI9340:
     CMD_CASET = 0x2A  # Column Address Set
     CMD_RASET = 0x2B  # Row Address Set
     CMD_RAMWR = 0x2C  # Write to Memory
+    CMD_RAMRD = 0x2E  # Read from Memory (dummy byte, then 3 bytes per pixel)
     CMD_COLMOD = 0x3A  # Set Pixel Format
     CMD_MADCTL = 0x36  # Memory Access Control
+    CMD_RDDPM = 0x0A  # Read Display Power Mode
+    CMD_RDDMADCTL = 0x0B  # Read Display MADCTL
+    CMD_RDDCOLMOD = 0x0C  # Read Display Pixel Format
+
+    # Power mode bits returned by RDDPM
+    PM_SLEEP_OUT = 0x10
+    PM_DISPLAY_ON = 0x04
+
+    # Register and memory reads are specified for a much slower serial clock
+    # than writes, so reads always use this speed
+    READ_SPEED = 4_000_000
+
+    MADCTL_VALUE = 0xC0  # Match the working configuration
+
+    # Hardware reset timing: RESX low >= 10 us, then up to 120 ms before the
+    # first command (120 ms applies when the reset hits a panel in sleep-out).
+    RESET_LOW_TIME = 0.00001
+    RESET_RECOVERY_TIME = 0.120
+
+    INIT_SEQUENCE = (
+        (CMD_SWRESET, None, 0.005),  # 5 ms after reset from sleep-in
+        (CMD_SLPOUT, None, 0.005),  # 5 ms before the next command
+        (CMD_COLMOD, None, 0),  # Data is DisplayHandler.pixel_format
+        (CMD_MADCTL, [MADCTL_VALUE], 0),
+        (CMD_DISPON, None, 0),
+    )
+
+
+class PixelFormat:
+    """
+    COLMOD values for the supported interface pixel formats.
+
+    Attributes:
+        RGB565 (int): 16 bits per pixel, 2 bytes on the wire (0x55).
+        RGB666 (int): 18 bits per pixel, 3 bytes on the wire (0x66).
+        RGB444 (int): 12 bits per pixel, 2 pixels per 3 bytes (0x33).
+    """
+
+    RGB565 = 0x55
+    RGB666 = 0x66
+    RGB444 = 0x33
 
 
 class Colors:
@@ -0,0 +1,132 @@
+import os
+import struct
+
+from const import PixelFormat
+
+_MAGIC = b"LCDL"
+_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sBBI")  # magic, version, pixel format, count
+_SEGMENT_HEADER = struct.Struct("<BI")  # is_data, length
+
+
+class DisplayList:
+    """
+    A recorded sequence of drawing operations, stored as the exact bytes
+    that go over SPI.
+
+    Each segment is (is_data, bytes): command bytes are sent with DC low and
+    data with DC high. Consecutive data writes are merged while recording,
+    so replaying costs one transfer per segment and no Python drawing work.
+    """
+
+    def __init__(self, pixel_format=PixelFormat.RGB565, segments=None):
+        self.pixel_format = pixel_format
+        self.segments = segments or []
+
+    def add(self, is_data, data):
+        if not data:
+            return
+        if is_data and self.segments and self.segments[-1][0]:
+            # Extend the previous data run instead of starting a new segment
+            self.segments[-1][1].extend(data)
+        else:
+            self.segments.append((is_data, bytearray(data)))
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def size(self):
+        """Total bytes on the wire."""
+        return sum(len(data) for _, data in self.segments)
+
+    def save(self, path):
+        """Write the list to `path` atomically, so a cut-off save leaves no file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_FILE_HEADER.pack(_MAGIC, _VERSION, self.pixel_format, len(self)))
+            for is_data, data in self.segments:
+                f.write(_SEGMENT_HEADER.pack(is_data, len(data)))
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a list written by save(); raises ValueError if it is damaged."""
+        with open(path, "rb") as f:
+            blob = f.read()
+        if len(blob) < _FILE_HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, pixel_format, count = _FILE_HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a display list file")
+
+        segments = []
+        offset = _FILE_HEADER.size
+        for _ in range(count):
+            if offset + _SEGMENT_HEADER.size > len(blob):
+                raise ValueError(f"{path} is truncated")
+            is_data, length = _SEGMENT_HEADER.unpack_from(blob, offset)
+            offset += _SEGMENT_HEADER.size
+            if offset + length > len(blob):
+                raise ValueError(f"{path} is truncated")
+            data = bytearray(blob[offset : offset + length])
+            segments.append((bool(is_data), data))
+            offset += length
+        if offset != len(blob):
+            raise ValueError(f"{path} has trailing data")
+        return cls(pixel_format, segments)
+
+
+class DisplayListCache:
+    """
+    Compiled display lists by name, in memory and optionally on disk.
+
+    show(name, build) replays the list for `name`, compiling it the first
+    time by recording build(display). Lists on disk are keyed by pixel
+    format too, since the recorded bytes depend on it.
+    """
+
+    def __init__(self, display, directory=None):
+        self.display = display
+        self.directory = directory
+        self.lists = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(
+            self.directory, f"{name}-{self.display.pixel_format:02x}.dlist"
+        )
+
+    def get(self, name, build):
+        display_list = self.lists.get(name)
+        if display_list is not None:
+            return display_list
+
+        if self.directory and os.path.exists(self._path(name)):
+            try:
+                display_list = DisplayList.load(self._path(name))
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Ignoring cached display list {name}: {e}")
+
+        if display_list is None:
+            with self.display.record() as display_list:
+                build(self.display)
+            if self.directory:
+                display_list.save(self._path(name))
+
+        self.lists[name] = display_list
+        return display_list
+
+    def show(self, name, build):
+        """Replay the list for `name`, recording it first if needed."""
+        self.display.replay(self.get(name, build))
+
+    def invalidate(self, name):
+        """Drop a list (e.g. after its content changed) from memory and disk."""
+        self.lists.pop(name, None)
+        if self.directory and os.path.exists(self._path(name)):
+            os.remove(self._path(name))
@@ -0,0 +1,130 @@
+import numpy as np
+
+from color import pack_pixels
+from const import PixelFormat
+from rects import intersect_rects, merge_rects
+
+
+class IndexedSurface:
+    """
+    8-bit palette-indexed framebuffer: one byte per pixel plus a 256-entry
+    RGB565 palette, half the memory of an RGB565 buffer.
+
+    Drawing writes palette indices and records damage. flush() expands the
+    damaged areas to wire format with a single NumPy table lookup. Changing
+    a palette entry only damages the area where that index is used, so
+    color animation never needs a redraw.
+    """
+
+    def __init__(self, width=240, height=320, palette=None):
+        self.width = width
+        self.height = height
+        self.bounds = (0, 0, width, height)
+        self.pixels = np.zeros((height, width), dtype=np.uint8)
+        self.palette = np.zeros(256, dtype=np.uint16)
+        if palette is not None:
+            self.palette[: len(palette)] = palette
+        self.damage = [self.bounds]
+
+        # Palette pre-packed per wire format, rebuilt when the palette changes
+        self._lut = None
+        self._lut_format = None
+
+    def invalidate(self, rect=None):
+        rect = intersect_rects(rect, self.bounds) if rect else self.bounds
+        if rect:
+            self.damage.append(rect)
+
+    def fill_rect(self, x, y, w, h, index):
+        rect = intersect_rects((x, y, w, h), self.bounds)
+        if rect is None:
+            return
+        x, y, w, h = rect
+        self.pixels[y : y + h, x : x + w] = index
+        self.damage.append(rect)
+
+    def set_pixel(self, x, y, index):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = index
+            self.damage.append((x, y, 1, 1))
+
+    def draw_indices(self, x, y, indices):
+        """Copy a 2-D uint8 array of palette indices to (x, y)."""
+        indices = np.asarray(indices, dtype=np.uint8)
+        h, w = indices.shape
+        rect = intersect_rects((x, y, w, h), self.bounds)
+        if rect is None:
+            return
+        cx, cy, cw, ch = rect
+        self.pixels[cy : cy + ch, cx : cx + cw] = indices[
+            cy - y : cy - y + ch, cx - x : cx - x + cw
+        ]
+        self.damage.append(rect)
+
+    def used_rects(self, indices, tile=16):
+        """
+        Rects covering the pixels that use any of `indices`, at `tile`-pixel
+        granularity, so scattered uses don't damage everything in between.
+        """
+        mask = np.isin(self.pixels, indices)
+        rows = -(-self.height // tile)
+        cols = -(-self.width // tile)
+        padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+        padded[: self.height, : self.width] = mask
+        used = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+        rects = []
+        for row in range(rows):
+            # One rect per run of used tiles in this tile row
+            col = 0
+            while col < cols:
+                if not used[row, col]:
+                    col += 1
+                    continue
+                start = col
+                while col < cols and used[row, col]:
+                    col += 1
+                rect = intersect_rects(
+                    (start * tile, row * tile, (col - start) * tile, tile), self.bounds
+                )
+                if rect:
+                    rects.append(rect)
+        return rects
+
+    def set_palette(self, entries):
+        """
+        Change palette entries ({index: rgb565}) and damage only the area
+        that uses them.
+        """
+        changed = [
+            index for index, color in entries.items() if self.palette[index] != color
+        ]
+        if not changed:
+            return
+        for index in changed:
+            self.palette[index] = entries[index]
+        self._lut = None
+        self.damage.extend(self.used_rects(changed))
+
+    def _wire_lut(self, pixel_format):
+        """Palette as a (256, bytes_per_pixel) uint8 table in wire format."""
+        if self._lut is None or self._lut_format != pixel_format:
+            packed = pack_pixels(self.palette, pixel_format)
+            self._lut = np.frombuffer(packed, dtype=np.uint8).reshape(256, -1)
+            self._lut_format = pixel_format
+        return self._lut
+
+    def flush(self, display):
+        """Send the damaged areas to `display`. Returns the number of rects."""
+        rects = merge_rects(self.damage)
+        self.damage = []
+
+        for x, y, w, h in rects:
+            region = self.pixels[y : y + h, x : x + w]
+            if display.pixel_format == PixelFormat.RGB444:
+                # Pixels share bytes in 12-bit mode, so expand then pack
+                display.blit(x, y, self.palette[region])
+            else:
+                data = self._wire_lut(display.pixel_format)[region].tobytes()
+                display.draw_buffer(x, y, w, h, data)
+        return len(rects)
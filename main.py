@@ -1,55 +1,61 @@
 from DisplayHandler import DisplayHandler
-from GpioHandler import GPIOHandler
 from SPIHandler import SPIHandler
-from touch_handler import XPT2046
+from touch_handler import LOW, XPT2046
 from const import ILI9340, Colors
+from spi_tuner import apply_tuned_speed
+from stroke import StrokeRenderer
+from tracing import tracer
+import os
 import time
 import signal
 import sys
-import RPi.GPIO as GPIO
+
+# Set LCD_GPIO=gpiod to drive the pins through /dev/gpiochip0 instead of
+# RPi.GPIO (needed on kernels/boards where RPi.GPIO doesn't work)
+USE_GPIOD = os.environ.get("LCD_GPIO") == "gpiod"
 
 # Initialize handlers
-gpio = GPIOHandler()
+if USE_GPIOD:
+    from GpiodHandler import GpiodHandler
+
+    gpio = GpiodHandler()
+else:
+    from GpioHandler import GPIOHandler
+
+    gpio = GPIOHandler()
 spi = SPIHandler()
 display = DisplayHandler(gpio_handler=gpio, spi_handler=spi, commands=ILI9340)
 
-# Track the last touch position to avoid duplicates
-last_touch_pos = None
+# Set LCD_TRACE=/path/to/trace.json to record a timeline, written on exit
+TRACE_FILE = os.environ.get("LCD_TRACE")
+if TRACE_FILE:
+    tracer.enable()
+
+# Calibration is loaded from here instead of prompting on every start; it
+# sits next to the SPI tuning file so it is found whatever the working dir
+CALIBRATION_FILE = os.path.expanduser("~/.config/lcddriver/touch_calibration.json")
+
+# Each stroke uses the next color; samples between strokes are interpolated
 touch_colors = [Colors.RED, Colors.GREEN, Colors.BLUE, Colors.WHITE]
-current_color_index = 0
+strokes = StrokeRenderer(display, colors=touch_colors, width=6)
 
 
 # Define the touch callback function
 def on_touch(coordinates):
-    global last_touch_pos, current_color_index
-
     x, y = coordinates
     print(f"Touch detected at X={x}, Y={y}")
-
-    # Change drawing color on each touch
-    current_color = touch_colors[current_color_index]
-    current_color_index = (current_color_index + 1) % len(touch_colors)
-
-    # Draw a small dot at the touch location
-    radius = 3  # Adjust size as needed
-    for dx in range(-radius, radius + 1):
-        for dy in range(-radius, radius + 1):
-            # Create a circle pattern
-            if dx * dx + dy * dy <= radius * radius:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < display.width and 0 <= ny < display.height:
-                    display.draw_pixel(nx, ny, current_color)
-
-    # Save last position to enable drawing lines between points
-    last_touch_pos = (x, y)
+    strokes.add_sample(coordinates)
 
 
 # Set up clean exit
 def cleanup(signum=None, frame=None):
     print("Cleaning up...")
     touch.stop_listening()
+    strokes.stop()
     gpio.cleanup()
     spi.close()
+    if TRACE_FILE:
+        tracer.dump(TRACE_FILE)
     print("Done.")
     sys.exit(0)
 
@@ -59,13 +65,14 @@ signal.signal(signal.SIGINT, cleanup)
 signal.signal(signal.SIGTERM, cleanup)
 
 if __name__ == "__main__":
-    # Initialize display
-    display.init_display()
-    time.sleep(0.1)
+    # Initialize display, skipping reset/sleep-out if it is already configured
+    display.init_display(warm=True)
+
+    # Run the display at the fastest clock this board has proven stable at
+    apply_tuned_speed(display)
 
     # Fill screen with a color
     display.fill_screen(Colors.BLACK)
-    time.sleep(0.5)
 
     print("Touch Screen Drawing Application")
     print("-" * 30)
@@ -77,6 +84,10 @@ if __name__ == "__main__":
         spi_handler=spi,  # Reuse SPI handler
         screen_width=240,
         screen_height=320,
+        self_test=False,  # Skip the startup SPI self test
+        spi_speed=2_000_000,  # Touch reads stay slow whatever the display runs at
+        track_drag=True,  # Stream samples while the finger moves
+        gpio_handler=gpio if USE_GPIOD else None,  # IRQ/CS via the same backend
     )
 
     # Test the SPI directly
@@ -91,23 +102,27 @@ if __name__ == "__main__":
     # Register touch callback
     touch.set_callback(on_touch)
 
-    # Ask if calibration is needed
-    calibrate = (
-        input("Would you like to calibrate the touch screen? (y/n): ").lower() == "y"
-    )
-    if calibrate:
-        success = touch.calibrate()
-        if success:
-            print("Calibration successful!")
-        else:
-            print("Calibration failed - using default values.")
+    # Use the saved calibration, only ask when there is none
+    if not touch.load_calibration(CALIBRATION_FILE):
+        calibrate = (
+            input("Would you like to calibrate the touch screen? (y/n): ").lower()
+            == "y"
+        )
+        if calibrate:
+            success = touch.calibrate()
+            if success:
+                print("Calibration successful!")
+                touch.save_calibration(CALIBRATION_FILE)
+            else:
+                print("Calibration failed - using default values.")
 
     print("\nStarting touch handler...")
+    strokes.start()
     touch.start_listening()  # No more polling_mode parameter
 
     print("\n=== Touch Screen Drawing Ready ===")
-    print("- Touch screen to draw")
-    print("- Each touch uses a different color")
+    print("- Touch and drag to draw")
+    print("- Each stroke uses a different color")
     print("- Press Ctrl+C to exit")
 
     try:
@@ -120,10 +135,10 @@ if __name__ == "__main__":
 
             # Periodic status check
             if counter % 20 == 0:  # Every 10 seconds
-                irq_state = GPIO.input(touch.tp_irq)
+                irq_state = touch._irq_state()
                 print(
                     f"Status: Touch controller is {'active' if touch.running else 'inactive'}, "
-                    f"IRQ: {'LOW (touched)' if irq_state == GPIO.LOW else 'HIGH (not touched)'}"
+                    f"IRQ: {'LOW (touched)' if irq_state == LOW else 'HIGH (not touched)'}"
                 )
 
     except KeyboardInterrupt:
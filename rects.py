@@ -0,0 +1,44 @@
+def intersect_rects(a, b):
+    """Intersection of two (x, y, w, h) rects, or None if they don't overlap."""
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1 = min(a[0] + a[2], b[0] + b[2])
+    y1 = min(a[1] + a[3], b[1] + b[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _union(a, b):
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1 = max(a[0] + a[2], b[0] + b[2])
+    y1 = max(a[1] + a[3], b[1] + b[3])
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def merge_rects(rects, max_rects=16):
+    """
+    Merge overlapping or touching damage rects.
+
+    If more than `max_rects` remain, they are collapsed into their bounding
+    box; past that point one larger write beats many window setups.
+    """
+    merged = []
+    for rect in rects:
+        changed = True
+        while changed:
+            changed = False
+            for other in merged:
+                grown = (other[0] - 1, other[1] - 1, other[2] + 2, other[3] + 2)
+                if intersect_rects(rect, grown):
+                    merged.remove(other)
+                    rect = _union(rect, other)
+                    changed = True
+                    break
+        merged.append(rect)
+
+    if len(merged) > max_rects:
+        bounds = merged[0]
+        for rect in merged[1:]:
+            bounds = _union(bounds, rect)
+        merged = [bounds]
+    return merged
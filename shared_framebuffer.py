@@ -0,0 +1,273 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from const import PixelFormat
+from rects import intersect_rects, merge_rects
+
+# Header layout (uint32 words) at the start of the shared memory block
+PUBLISHED = 0  # Sequence number of the latest published frame
+TAKEN = 1  # Sequence number the I/O process has picked up
+FLUSHED = 2  # Sequence number that is fully on the panel
+RECT_COUNT = 3
+RECTS = 4  # MAX_RECTS x (x, y, w, h)
+MAX_RECTS = 32
+HEADER_WORDS = RECTS + MAX_RECTS * 4
+HEADER_SIZE = HEADER_WORDS * 4
+
+
+class SharedFramebuffer:
+    """
+    RGB565 framebuffer in a multiprocessing.shared_memory block.
+
+    The rendering process draws into `pixels` (a height x width uint16 array)
+    and calls publish() with the rects it changed. The I/O process picks them
+    up with take() and reports completion with mark_flushed(). The header
+    holds three sequence numbers (published, taken, flushed) guarded by a
+    small lock, so neither side ever waits on the other's drawing or SPI work.
+    """
+
+    def __init__(self, width=240, height=320, name=None, lock=None, wake=None):
+        self.width = width
+        self.height = height
+        size = HEADER_SIZE + width * height * 2
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+
+        buffer = self.shm.buf
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint32, buffer=buffer)
+        self.pixels = np.ndarray(
+            (height, width), dtype=np.uint16, buffer=buffer, offset=HEADER_SIZE
+        )
+        if self.owner:
+            self.header[:] = 0
+            self.pixels[:] = 0
+
+        ctx = multiprocessing.get_context("spawn")
+        self.lock = lock or ctx.Lock()
+        self.wake = wake or ctx.Event()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, rects=None):
+        """
+        Publish changed rects (default: the whole frame) and return the new
+        sequence number. Rects not yet picked up are merged, not dropped.
+        Rects are clipped to the framebuffer; if none are left, nothing is
+        published and the current sequence number is returned.
+        """
+        full = (0, 0, self.width, self.height)
+        rects = [intersect_rects(rect, full) for rect in rects or [full]]
+        rects = [rect for rect in rects if rect]
+        with self.lock:
+            if not rects:
+                return int(self.header[PUBLISHED])
+            if self.header[PUBLISHED] != self.header[TAKEN]:
+                rects = self._pending() + rects
+            rects = merge_rects(rects, MAX_RECTS)
+
+            count = len(rects)
+            self.header[RECTS : RECTS + count * 4] = np.asarray(rects).ravel()
+            self.header[RECT_COUNT] = count
+            self.header[PUBLISHED] += 1
+            sequence = int(self.header[PUBLISHED])
+        self.wake.set()
+        return sequence
+
+    def _pending(self):
+        count = int(self.header[RECT_COUNT])
+        words = self.header[RECTS : RECTS + count * 4].reshape(-1, 4)
+        return [tuple(int(v) for v in rect) for rect in words]
+
+    def take(self):
+        """I/O side: return (sequence, rects) of a new frame, or None."""
+        with self.lock:
+            sequence = int(self.header[PUBLISHED])
+            if sequence == self.header[TAKEN]:
+                return None
+            rects = self._pending()
+            self.header[TAKEN] = sequence
+        return sequence, rects
+
+    def mark_flushed(self, sequence):
+        self.header[FLUSHED] = sequence
+
+    def wait_flushed(self, sequence=None, timeout=None):
+        """
+        Wait until `sequence` (default: the latest published) is on the panel.
+        Use before redrawing an area to avoid tearing. Returns False on timeout.
+        """
+        if sequence is None:
+            sequence = int(self.header[PUBLISHED])
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while int(self.header[FLUSHED]) < sequence:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def close(self):
+        # Drop the numpy views before closing the mapping
+        self.header = None
+        self.pixels = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    """Attach to an existing block without taking over its cleanup."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned children share the creator's resource
+        # tracker, so attaching does not add a second owner
+        return shared_memory.SharedMemory(name=name)
+
+
+def create_display(config):
+    """Default display factory for the I/O process: real GPIO/SPI handlers."""
+    from DisplayHandler import DisplayHandler
+    from GpioHandler import GPIOHandler
+    from SPIHandler import SPIHandler
+    from const import ILI9340
+
+    gpio = GPIOHandler()
+    spi = SPIHandler(max_speed=config.get("spi_speed", 10_000_000))
+    display = DisplayHandler(
+        gpio_handler=gpio,
+        spi_handler=spi,
+        commands=ILI9340,
+        pixel_format=config.get("pixel_format", PixelFormat.RGB565),
+    )
+    display.init_display(warm=True)
+
+    if config.get("tune_spi"):
+        from spi_tuner import apply_tuned_speed
+
+        apply_tuned_speed(display)
+    return display
+
+
+def _io_main(name, width, height, lock, wake, stop, touch_events, config, factory):
+    """I/O process: owns SPI/GPIO, flushes published frames, forwards touches."""
+    framebuffer = SharedFramebuffer(width, height, name=name, lock=lock, wake=wake)
+    display = factory(config)
+
+    touch = None
+    if config.get("touch"):
+        from touch_handler import XPT2046
+
+        touch = XPT2046(
+            spi_handler=display.spi,
+            screen_width=width,
+            screen_height=height,
+            self_test=False,
+            spi_speed=config.get("touch_spi_speed", 2_000_000),
+        )
+        if config.get("calibration_file"):
+            touch.load_calibration(config["calibration_file"])
+        touch.set_callback(touch_events.put)
+        touch.start_listening()
+
+    try:
+        while not stop.is_set():
+            if not wake.wait(0.1):
+                continue
+            wake.clear()
+            frame = framebuffer.take()
+            if frame is None:
+                continue
+            sequence, rects = frame
+            try:
+                for x, y, w, h in rects:
+                    display.blit(x, y, framebuffer.pixels[y : y + h, x : x + w])
+            except Exception as e:
+                # Log and keep serving later frames instead of exiting
+                print(f"Display I/O error on frame {sequence}: {e}")
+            # Marked even on error so wait_flushed() callers are not stuck
+            framebuffer.mark_flushed(sequence)
+    finally:
+        if touch:
+            touch.stop_listening()
+        close = getattr(display.spi, "close", None)
+        if close:
+            close()
+        cleanup = getattr(display.gpio, "cleanup", None)
+        if cleanup:
+            cleanup()
+        framebuffer.close()
+
+
+class DisplayServer:
+    """
+    Runs the display I/O in a separate process.
+
+    The application renders into `framebuffer.pixels` and calls
+    `framebuffer.publish(rects)`; a dedicated process owns SPI, GPIO and the
+    touch controller, so Python rendering no longer competes with them for
+    the GIL. Touch coordinates come back through poll_touch().
+    """
+
+    def __init__(
+        self,
+        width=240,
+        height=320,
+        pixel_format=PixelFormat.RGB565,
+        touch=True,
+        calibration_file=None,
+        tune_spi=False,
+        factory=create_display,
+    ):
+        self.framebuffer = SharedFramebuffer(width, height)
+        ctx = multiprocessing.get_context("spawn")
+        self.stop_event = ctx.Event()
+        self.touch_events = ctx.Queue()
+        config = {
+            "pixel_format": pixel_format,
+            "touch": touch,
+            "calibration_file": calibration_file,
+            "tune_spi": tune_spi,
+        }
+        self.process = ctx.Process(
+            target=_io_main,
+            args=(
+                self.framebuffer.name,
+                width,
+                height,
+                self.framebuffer.lock,
+                self.framebuffer.wake,
+                self.stop_event,
+                self.touch_events,
+                config,
+                factory,
+            ),
+            daemon=True,
+        )
+
+    def start(self):
+        self.process.start()
+
+    def poll_touch(self, timeout=0):
+        """Return the next (x, y) touch from the I/O process, or None."""
+        try:
+            if timeout:
+                return self.touch_events.get(timeout=timeout)
+            return self.touch_events.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.stop_event.set()
+        self.framebuffer.wake.set()
+        self.process.join(timeout=2.0)
+        self.framebuffer.close()
@@ -0,0 +1,182 @@
+import json
+import os
+import random
+
+import numpy as np
+
+from const import PixelFormat
+
+# Speeds to try, lowest first. The Pi's SPI clock is the core clock divided
+# by an even number, so the driver rounds each of these down to the nearest
+# divider anyway.
+DEFAULT_SPEEDS = (
+    4_000_000,
+    8_000_000,
+    10_000_000,
+    16_000_000,
+    20_000_000,
+    25_000_000,
+    32_000_000,
+    40_000_000,
+    48_000_000,
+    62_500_000,
+)
+
+DEFAULT_TUNING_FILE = os.path.expanduser("~/.config/lcddriver/spi_speed.json")
+
+# Test window in the top-left corner
+TEST_WIDTH = 32
+TEST_HEIGHT = 8
+
+
+def _test_patterns(pixels):
+    """RGB565 patterns that exercise long runs, fast toggling and random data."""
+    walking_bit = (1 << np.arange(16)).astype(np.uint16)
+    patterns = [
+        np.full(pixels, 0xFFFF, dtype=np.uint16),
+        np.full(pixels, 0x0000, dtype=np.uint16),
+        np.resize(np.array([0xAAAA, 0x5555], dtype=np.uint16), pixels),
+        np.resize(walking_bit, pixels),
+    ]
+    rng = random.Random(0x9340)
+    patterns.append(
+        np.array([rng.getrandbits(16) for _ in range(pixels)], dtype=np.uint16)
+    )
+    return patterns
+
+
+def _channel_bits(pixel_format):
+    """Significant bits per channel that survive the trip for a format."""
+    if pixel_format == PixelFormat.RGB444:
+        return 4, 4, 4
+    return 5, 6, 5
+
+
+def _count_errors(written, readback, pixel_format):
+    """Compare written RGB565 values with RAMRD's 3-bytes-per-pixel output."""
+    readback = np.asarray(readback, dtype=np.uint16)
+    if readback.size != written.size * 3:
+        return written.size
+    readback = readback.reshape(-1, 3)
+
+    # Channels in wire order: bits 15-11, 10-5, 4-0 of the RGB565 value
+    channels = ((written >> 11) & 0x1F, (written >> 5) & 0x3F, written & 0x1F)
+    widths = (5, 6, 5)
+    errors = np.zeros(written.size, dtype=bool)
+    for i, keep in enumerate(_channel_bits(pixel_format)):
+        expected = channels[i] >> (widths[i] - keep)
+        actual = readback[:, i] >> (8 - keep)
+        errors |= expected != actual
+    return int(errors.sum())
+
+
+def verify_speed(display, speed, trials=1):
+    """
+    Write the test patterns at `speed`, read them back and return the number
+    of mismatched pixels. Readback always runs at the panel's slow read clock
+    (DisplayHandler.read_register sets it per transfer), so only the write
+    speed is being tested.
+    """
+    spi = display.spi
+    errors = 0
+    spi.set_speed(speed)
+    for _ in range(trials):
+        for pattern in _test_patterns(TEST_WIDTH * TEST_HEIGHT):
+            display.blit(0, 0, pattern.reshape(TEST_HEIGHT, TEST_WIDTH))
+            readback = display.read_memory(0, 0, TEST_WIDTH, TEST_HEIGHT)
+            errors += _count_errors(pattern, readback, display.pixel_format)
+    return errors
+
+
+def tune_spi_speed(display, speeds=DEFAULT_SPEEDS, margin=1, trials=3):
+    """
+    Binary-search the highest speed in `speeds` that writes with zero errors.
+
+    The result is then backed off by `margin` steps and re-verified, so the
+    chosen speed is not sitting right at the edge. Returns the speed (the SPI
+    handler is left running at it), or None if readback does not work at all,
+    e.g. on boards without MISO wired to the panel.
+    """
+    spi = display.spi
+    original = spi.spi.max_speed_hz
+    speeds = sorted(speeds)
+
+    if verify_speed(display, speeds[0], trials):
+        print("SPI tuning: readback fails even at the lowest speed, not tuning")
+        spi.set_speed(original)
+        return None
+
+    low, high = 0, len(speeds) - 1  # speeds[low] is known good
+    while low < high:
+        mid = (low + high + 1) // 2
+        errors = verify_speed(display, speeds[mid], trials)
+        print(f"SPI tuning: {speeds[mid] / 1e6:.1f} MHz -> {errors} errors")
+        if errors:
+            high = mid - 1
+        else:
+            low = mid
+
+    chosen = max(low - margin, 0)
+    while chosen > 0 and verify_speed(display, speeds[chosen], trials):
+        chosen -= 1
+
+    speed = speeds[chosen]
+    spi.set_speed(speed)
+    print(
+        f"SPI tuning: highest clean speed {speeds[low] / 1e6:.1f} MHz, "
+        f"using {speed / 1e6:.1f} MHz"
+    )
+    return speed
+
+
+def _device_key(spi):
+    return f"spidev{spi.bus}.{spi.device}"
+
+
+def load_tuned_speed(spi, path=DEFAULT_TUNING_FILE):
+    """Return the persisted speed for this SPI device, or None."""
+    try:
+        with open(path) as f:
+            return int(json.load(f)[_device_key(spi)])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_tuned_speed(spi, speed, path=DEFAULT_TUNING_FILE):
+    """Persist `speed` for this SPI device, keeping entries for others."""
+    try:
+        with open(path) as f:
+            speeds = json.load(f)
+    except (OSError, ValueError):
+        speeds = {}
+    speeds[_device_key(spi)] = int(speed)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(speeds, f, indent=2)
+
+
+def apply_tuned_speed(display, path=DEFAULT_TUNING_FILE, retune=False):
+    """
+    Use the persisted speed for this device, tuning (and saving) first if
+    there is none. Tuning draws test patterns in the top-left corner, so
+    call this before drawing the UI. Returns the speed in use.
+
+    If the panel can't be read back the current speed is saved instead, so
+    startup doesn't repeat the failed tuning; pass retune=True to try again.
+    """
+    spi = display.spi
+    speed = None if retune else load_tuned_speed(spi, path)
+    if speed is not None:
+        spi.set_speed(speed)
+        print(f"Using tuned SPI speed {speed / 1e6:.1f} MHz")
+        return speed
+
+    speed = tune_spi_speed(display)
+    if speed is None:
+        speed = spi.spi.max_speed_hz
+        print(f"Keeping SPI speed {speed / 1e6:.1f} MHz for this device")
+    save_tuned_speed(spi, speed, path)
+    return speed
@@ -0,0 +1,280 @@
+import threading
+import time
+from queue import Queue, Empty
+
+import numpy as np
+
+from const import Colors
+from tracing import tracer
+
+
+def catmull_rom(p0, p1, p2, p3, spacing):
+    """
+    Points along the Catmull-Rom segment from p1 to p2, no further apart than
+    `spacing` pixels. p1 is excluded so consecutive segments don't repeat it.
+    """
+    points = np.array([p0, p1, p2, p3], dtype=float)
+    length = np.hypot(*(points[2] - points[1]))
+    steps = max(int(np.ceil(length / spacing)), 1)
+    t = np.linspace(0, 1, steps + 1)[1:, None]
+    t2 = t * t
+    t3 = t2 * t
+    return 0.5 * (
+        2 * points[1]
+        + (points[2] - points[0]) * t
+        + (2 * points[0] - 5 * points[1] + 4 * points[2] - points[3]) * t2
+        + (3 * points[1] - points[0] - 3 * points[2] + points[3]) * t3
+    )
+
+
+def _disc_rows(centers, radius):
+    """(ys, lo, hi): x extent of the disc around each center on each row."""
+    reach = int(np.ceil(radius))
+    ys = np.rint(centers[:, 1:2]) + np.arange(-reach, reach + 1)
+    half_sq = radius * radius - (ys - centers[:, 1:2]) ** 2
+    keep = half_sq >= 0
+    half = np.sqrt(np.where(keep, half_sq, 0))
+    return ys[keep], (centers[:, 0:1] - half)[keep], (centers[:, 0:1] + half)[keep]
+
+
+def _linear_range(coef, c0, c1):
+    """Elementwise (lo, hi) range of t with c0 <= coef * t <= c1; may be empty."""
+    flat = coef == 0
+    # With coef == 0 the condition holds for every t or for none
+    holds = (c0 <= 0) & (c1 >= 0)
+    safe = np.where(flat, 1, coef)
+    e0, e1 = c0 / safe, c1 / safe
+    lo = np.where(flat, np.where(holds, -np.inf, np.inf), np.minimum(e0, e1))
+    hi = np.where(flat, np.where(holds, np.inf, -np.inf), np.maximum(e0, e1))
+    return lo, hi
+
+
+def _band_rows(starts, ends, radius):
+    """
+    (ys, lo, hi): x extent, on each row, of the points within `radius` of
+    each segment's interior (the part of the capsule between the end discs).
+    """
+    d = ends - starts
+    length = np.hypot(d[:, 0], d[:, 1])
+    moving = length > 0
+    starts, d, length = starts[moving], d[moving], length[moving, None]
+    if not len(starts):
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    low_y = np.minimum(starts[:, 1], starts[:, 1] + d[:, 1])
+    top = np.ceil(low_y - radius)
+    count = int(np.max(np.floor(low_y + np.abs(d[:, 1]) + radius) - top)) + 1
+    ys = top[:, None] + np.arange(count)
+    ry = ys - starts[:, 1:2]
+    dx, dy = d[:, 0:1], d[:, 1:2]
+
+    # Both conditions are linear in rx = x - start_x: within `radius` of the
+    # segment's line, and projecting onto the segment between its ends
+    near_lo, near_hi = _linear_range(
+        dy, dx * ry - radius * length, dx * ry + radius * length
+    )
+    along_lo, along_hi = _linear_range(dx, -dy * ry, length * length - dy * ry)
+    lo = np.maximum(near_lo, along_lo)
+    hi = np.minimum(near_hi, along_hi)
+
+    keep = lo <= hi
+    offset = np.broadcast_to(starts[:, 0:1], ys.shape)
+    return ys[keep], lo[keep] + offset[keep], hi[keep] + offset[keep]
+
+
+def stroke_spans(centers, radius, width, height):
+    """
+    Rasterize the polyline through `centers`, `radius` pixels thick, into
+    horizontal spans merged per row.
+
+    Every pixel within `radius` of a segment is covered (a capsule per
+    segment), so edges come out straight instead of scalloped by stamped
+    discs. Returns {y: [(x0, x1), ...]} with inclusive, non-overlapping
+    spans clipped to the screen.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    pieces = [
+        _disc_rows(centers, radius),
+        _band_rows(centers[:-1], centers[1:], radius),
+    ]
+    ys = np.concatenate([piece[0] for piece in pieces]).astype(int)
+    # Pixel x is covered if it lies inside the interval; the tolerance keeps
+    # float noise from dropping pixels that sit exactly on the edge
+    x0s = np.ceil(np.concatenate([piece[1] for piece in pieces]) - 1e-6).astype(int)
+    x1s = np.floor(np.concatenate([piece[2] for piece in pieces]) + 1e-6).astype(int)
+
+    keep = (ys >= 0) & (ys < height) & (x1s >= 0) & (x0s < width) & (x0s <= x1s)
+    ys = ys[keep]
+    x0s = np.clip(x0s[keep], 0, width - 1)
+    x1s = np.clip(x1s[keep], 0, width - 1)
+
+    order = np.lexsort((x0s, ys))
+    rows = {}
+    candidates = zip(ys[order].tolist(), x0s[order].tolist(), x1s[order].tolist())
+    for y, x0, x1 in candidates:
+        spans = rows.setdefault(y, [])
+        if spans and x0 <= spans[-1][1] + 1:
+            if x1 > spans[-1][1]:
+                spans[-1] = (spans[-1][0], x1)
+        else:
+            spans.append((x0, x1))
+    return rows
+
+
+def spans_to_rects(rows):
+    """Stack identical spans on consecutive rows into (x, y, w, h) rects."""
+
+    def rect(span, run):
+        return span[0], run[0], span[1] - span[0] + 1, run[1] - run[0] + 1
+
+    rects = []
+    open_runs = {}  # (x0, x1) -> [first_y, last_y]
+    for y in sorted(rows):
+        current = {}
+        for span in rows[y]:
+            run = open_runs.pop(span, None)
+            if run is not None and run[1] == y - 1:
+                run[1] = y
+            else:
+                if run is not None:
+                    rects.append(rect(span, run))
+                run = [y, y]
+            current[span] = run
+        # Spans that did not continue on this row are finished
+        rects.extend(rect(span, run) for span, run in open_runs.items())
+        open_runs = current
+    rects.extend(rect(span, run) for span, run in open_runs.items())
+    return rects
+
+
+class StrokeRenderer:
+    """
+    Turns a stream of touch samples into continuous thick strokes.
+
+    Samples are queued by add_sample() (usable directly as an XPT2046
+    callback) and drawn by a worker thread. Each pass takes every sample
+    that has arrived, interpolates between them with Catmull-Rom splines,
+    rasterizes the whole batch into merged spans and writes those as
+    rectangles with fill_rect(). A backlog only makes the next batch
+    bigger, so drawing never falls behind the touch rate.
+    """
+
+    def __init__(self, display, colors=(Colors.WHITE,), width=6, stroke_timeout=0.08):
+        self.display = display
+        self.colors = list(colors)
+        self.radius = max(width // 2, 1)
+        self.stroke_timeout = stroke_timeout
+
+        self.sample_queue = Queue()
+        self.running = False
+        self.worker_thread = None
+
+        # Current stroke state
+        self.points = []  # Last few control points (at most 4)
+        self.stroke_points = 0  # Control points in the current stroke
+        self.last_center = None  # End of what was drawn, joined onto next fill
+        self.last_sample_time = 0
+        self.stroke_count = 0
+        self.color = self.colors[0]
+
+    def add_sample(self, coordinates):
+        """Queue a touch sample (x, y)."""
+        self.sample_queue.put((time.monotonic(), coordinates[0], coordinates[1]))
+
+    def start(self):
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self.worker_thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.worker_thread:
+            self.worker_thread.join(timeout=1.0)
+        self._end_stroke()
+
+    def _worker(self):
+        while self.running:
+            try:
+                batch = [self.sample_queue.get(timeout=self.stroke_timeout)]
+            except Empty:
+                # No samples for a while: finish the tail of the stroke
+                self._end_stroke()
+                continue
+            while True:
+                try:
+                    batch.append(self.sample_queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                self._draw_batch(batch)
+            except Exception as e:
+                print(f"Stroke drawing error: {e}")
+
+    def _begin_stroke(self):
+        self.color = self.colors[self.stroke_count % len(self.colors)]
+        self.stroke_count += 1
+        self.points = []
+        self.stroke_points = 0
+        self.last_center = None
+
+    def _end_stroke(self):
+        """Draw the last segment, which was held back waiting for a next point."""
+        if self.stroke_points >= 2:
+            points = self.points
+            p0 = points[-3] if len(points) >= 3 else points[-2]
+            tail = catmull_rom(p0, points[-2], points[-1], points[-1], self.radius / 2)
+            self._fill(tail)
+        self.points = []
+        self.stroke_points = 0
+        self.last_center = None
+
+    def _add_point(self, point):
+        """
+        Add a control point and return the centers that can be drawn now.
+
+        A Catmull-Rom segment needs the point after it, so each segment is
+        drawn one sample late; the first point is stamped right away.
+        """
+        if self.points and point == self.points[-1]:
+            return None
+        self.points = (self.points + [point])[-4:]
+        self.stroke_points += 1
+
+        spacing = self.radius / 2
+        if self.stroke_points == 1:
+            return np.array([point], dtype=float)
+        if self.stroke_points == 3:
+            # First segment: repeat the start point as its own predecessor
+            p0, p1, p2 = self.points
+            return catmull_rom(p0, p0, p1, p2, spacing)
+        if self.stroke_points >= 4:
+            return catmull_rom(*self.points, spacing)
+        return None
+
+    def _draw_batch(self, batch):
+        with tracer.span("stroke.batch", "stroke"):
+            centers = []
+            for sample_time, x, y in batch:
+                if sample_time - self.last_sample_time > self.stroke_timeout:
+                    if centers:
+                        self._fill(np.concatenate(centers))
+                        centers = []
+                    self._end_stroke()
+                    self._begin_stroke()
+                self.last_sample_time = sample_time
+                segment = self._add_point((x, y))
+                if segment is not None:
+                    centers.append(segment)
+            if centers:
+                self._fill(np.concatenate(centers))
+
+    def _fill(self, centers):
+        if self.last_center is not None:
+            # Start from the previous fill's last center so the pieces connect
+            centers = np.vstack([self.last_center, centers])
+        self.last_center = centers[-1]
+        rows = stroke_spans(
+            centers, self.radius, self.display.width, self.display.height
+        )
+        for x, y, w, h in spans_to_rects(rows):
+            self.display.fill_rect(x, y, w, h, self.color)
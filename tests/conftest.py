@@ -0,0 +1,7 @@
+import importlib.util
+
+# test_spi.py is a copy of SPIHandler kept for trying out the bus on a Pi,
+# not a pytest module; it needs the real spidev to even import
+collect_ignore = []
+if importlib.util.find_spec("spidev") is None:
+    collect_ignore.append("test_spi.py")
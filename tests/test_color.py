@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from color import pack_pixels, rgb565_to_rgb, rgb_to_rgb565, wire_size
+from const import Colors, PixelFormat
+
+
+def test_rgb565_is_big_endian():
+    data = pack_pixels([Colors.BLUE, Colors.RED], PixelFormat.RGB565)
+    assert data == bytes([0xF8, 0x00, 0x00, 0x1F])
+
+
+def test_rgb666_bytes():
+    pixels = [0xF800, 0x07E0, 0x001F, 0x8410]
+    data = pack_pixels(pixels, PixelFormat.RGB666)
+    # One byte per channel, 6 bits left-aligned
+    assert data == bytes.fromhex("f80000 00fc00 0000f8 808080")
+
+
+def test_rgb444_even_count():
+    data = pack_pixels([0xF800, 0x07E0, 0xFFFF, 0x001F], PixelFormat.RGB444)
+    assert data == bytes([0xF0, 0x00, 0xF0, 0xFF, 0xF0, 0x0F])
+
+
+def test_rgb444_odd_count_is_truncated_after_last_pixel():
+    data = pack_pixels([0xFFFF, 0x001F, 0xF800], PixelFormat.RGB444)
+    assert data == bytes([0xFF, 0xF0, 0x0F, 0xF0, 0x00])
+
+
+def test_rgb444_single_pixel():
+    # Three channel nibbles in wire order, then one nibble of padding
+    assert pack_pixels([0x001F], PixelFormat.RGB444) == bytes([0x00, 0xF0])
+
+
+@pytest.mark.parametrize(
+    "pixel_format", [PixelFormat.RGB565, PixelFormat.RGB666, PixelFormat.RGB444]
+)
+@pytest.mark.parametrize("count", [1, 2, 7, 240])
+def test_packed_length_matches_wire_size(pixel_format, count):
+    pixels = np.arange(count, dtype=np.uint16)
+    assert len(pack_pixels(pixels, pixel_format)) == wire_size(count, pixel_format)
+
+
+def test_2d_input_is_packed_row_major():
+    pixels = np.array([[1, 2], [3, 4]], dtype=np.uint16)
+    assert pack_pixels(pixels) == pack_pixels([1, 2, 3, 4])
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        pack_pixels([0], 0x77)
+    with pytest.raises(ValueError):
+        wire_size(1, 0x77)
+
+
+def test_rgb565_round_trip():
+    pixels = np.array([0x0000, 0xFFFF, 0xF800, 0x07E0, 0x001F, 0x1234], np.uint16)
+    assert np.array_equal(rgb_to_rgb565(rgb565_to_rgb(pixels)), pixels)
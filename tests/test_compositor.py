@@ -0,0 +1,87 @@
+import numpy as np
+
+from compositor import Compositor, Layer
+from const import Colors
+
+
+class FakeDisplay:
+    width = 64
+    height = 48
+
+    def __init__(self):
+        self.blits = []
+
+    def blit(self, x, y, pixels):
+        self.blits.append((x, y, pixels.copy()))
+
+
+def flushed_compositor():
+    display = FakeDisplay()
+    compositor = Compositor(display)
+    compositor.flush()
+    display.blits.clear()
+    return display, compositor
+
+
+def blit_rects(display):
+    return sorted((x, y, p.shape[1], p.shape[0]) for x, y, p in display.blits)
+
+
+def test_half_opacity_white_over_black():
+    display, compositor = flushed_compositor()
+    layer = compositor.add_layer(Layer(4, 4, 10, 10, opacity=0.5))
+    layer.fill((255, 255, 255, 255))
+
+    assert compositor.flush() == [(10, 10, 4, 4)]
+    ((x, y, pixels),) = display.blits
+    assert (x, y) == (10, 10)
+    assert (pixels == 0x8410).all()
+
+
+def test_transparent_pixels_keep_the_base():
+    display, compositor = flushed_compositor()
+    compositor.base[:] = 0x1234
+    layer = compositor.add_layer(Layer(4, 4))
+    layer.rgba[0, 0] = (255, 0, 0, 255)
+    layer.update()
+
+    compositor.flush()
+    pixels = display.blits[0][2]
+    assert pixels[0, 0] == Colors.RED
+    assert (pixels.ravel()[1:] == 0x1234).all()
+
+
+def test_move_flushes_old_and_new_rect():
+    display, compositor = flushed_compositor()
+    layer = compositor.add_layer(Layer(8, 8, 0, 0))
+    layer.fill((255, 255, 255, 255))
+    compositor.flush()
+    display.blits.clear()
+
+    layer.move(40, 30)
+    compositor.flush()
+    assert blit_rects(display) == [(0, 0, 8, 8), (40, 30, 8, 8)]
+    old, new = sorted(display.blits, key=lambda blit: blit[:2])
+    assert (old[2] == 0).all()
+    assert (new[2] == Colors.WHITE).all()
+
+
+def test_layer_at_negative_offset_is_clipped():
+    display, compositor = flushed_compositor()
+    layer = compositor.add_layer(Layer(10, 10, -6, -4))
+    # Only the bottom-right 4x6 of the layer is on screen
+    layer.rgba[4:, 6:] = (0, 0, 255, 255)
+    layer.update()
+
+    assert compositor.flush() == [(0, 0, 4, 6)]
+    pixels = display.blits[0][2]
+    assert pixels.shape == (6, 4)
+    assert (pixels == Colors.BLUE).all()
+
+
+def test_layer_fully_offscreen_sends_nothing():
+    display, compositor = flushed_compositor()
+    layer = compositor.add_layer(Layer(10, 10, -20, -20))
+    layer.fill((255, 255, 255, 255))
+    assert compositor.flush() == []
+    assert display.blits == []
@@ -0,0 +1,78 @@
+from const import ILI9340, PixelFormat
+from DisplayHandler import DisplayHandler
+
+
+class FakeGPIO:
+    cs_pin = 8
+    rs_pin = 22
+    rst_pin = 27
+
+    def __init__(self, log):
+        self.log = log
+
+    def set_pin(self, pin, value):
+        self.log.append(("pin", pin, value))
+
+
+class FakeGPIOWithSetPins(FakeGPIO):
+    def set_pins(self, values):
+        self.log.append(("pins", values))
+
+
+class FakeSPI:
+    def __init__(self, log):
+        self.log = log
+
+    def write(self, data):
+        self.log.append(("spi", list(data)))
+
+    def read(self, data, speed=None):
+        self.log.append(("read", len(data), speed))
+        return [0x9C] * len(data)
+
+
+def make_display(gpio_class):
+    log = []
+    display = DisplayHandler(gpio_class(log), FakeSPI(log), ILI9340)
+    return display, log
+
+
+def test_select_uses_set_pins_when_available():
+    display, log = make_display(FakeGPIOWithSetPins)
+    display.send_command(0x2C)
+    assert log == [
+        ("pins", {22: 0, 8: 0}),
+        ("spi", [0x2C]),
+        ("pin", 8, 1),
+    ]
+
+
+def test_select_falls_back_to_set_pin():
+    display, log = make_display(FakeGPIO)
+    display.send_data([1, 2])
+    assert log == [
+        ("pin", 22, 1),
+        ("pin", 8, 0),
+        ("spi", [1, 2]),
+        ("pin", 8, 1),
+    ]
+
+
+def test_read_register_uses_read_clock():
+    display, log = make_display(FakeGPIO)
+    assert display.read_register(0x0A, 2) == [0x9C, 0x9C]
+    assert ("read", 2, ILI9340.READ_SPEED) in log
+    assert log[-1] == ("pin", 8, 1)
+
+
+def test_init_sends_the_display_pixel_format(monkeypatch):
+    monkeypatch.setattr("DisplayHandler.time.sleep", lambda seconds: None)
+    log = []
+    display = DisplayHandler(
+        FakeGPIO(log), FakeSPI(log), ILI9340, pixel_format=PixelFormat.RGB666
+    )
+    display.init_display()
+
+    colmod = log.index(("spi", [ILI9340.CMD_COLMOD]))
+    assert log[colmod + 2 : colmod + 4] == [("pin", 22, 1), ("pin", 8, 0)]
+    assert log[colmod + 4] == ("spi", [PixelFormat.RGB666])
@@ -0,0 +1,123 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from const import PixelFormat
+from display_list import DisplayList, DisplayListCache
+
+
+def sample_list():
+    display_list = DisplayList(PixelFormat.RGB666)
+    display_list.add(False, [0x2A])
+    display_list.add(True, [0x00, 0x00, 0x00, 0xEF])
+    display_list.add(False, [0x2C])
+    display_list.add(True, bytes(range(100)))
+    return display_list
+
+
+def test_consecutive_data_is_merged():
+    display_list = DisplayList()
+    display_list.add(False, [0x2C])
+    display_list.add(True, [1, 2])
+    display_list.add(True, b"\x03")
+    display_list.add(True, [])
+    assert display_list.segments == [
+        (False, bytearray([0x2C])),
+        (True, bytearray([1, 2, 3])),
+    ]
+    assert display_list.size == 4
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "splash.dlist")
+    original = sample_list()
+    original.save(path)
+
+    loaded = DisplayList.load(path)
+    assert loaded.pixel_format == PixelFormat.RGB666
+    assert loaded.segments == original.segments
+    assert os.listdir(tmp_path) == ["splash.dlist"]
+
+
+@pytest.mark.parametrize("cut", [0, 5, 12, 40, -1])
+def test_truncated_file_is_rejected(tmp_path, cut):
+    path = str(tmp_path / "splash.dlist")
+    sample_list().save(path)
+    with open(path, "rb") as f:
+        blob = f.read()
+    with open(path, "wb") as f:
+        f.write(blob[:cut])
+
+    with pytest.raises(ValueError):
+        DisplayList.load(path)
+
+
+def test_trailing_bytes_are_rejected(tmp_path):
+    path = str(tmp_path / "splash.dlist")
+    sample_list().save(path)
+    with open(path, "ab") as f:
+        f.write(b"\x00")
+
+    with pytest.raises(ValueError):
+        DisplayList.load(path)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = str(tmp_path / "splash.dlist")
+    with open(path, "wb") as f:
+        f.write(b"not a display list")
+
+    with pytest.raises(ValueError):
+        DisplayList.load(path)
+
+
+class FakeDisplay:
+    pixel_format = PixelFormat.RGB565
+
+    def __init__(self):
+        self.recording = None
+        self.replayed = []
+
+    @contextmanager
+    def record(self):
+        self.recording = DisplayList(self.pixel_format)
+        yield self.recording
+        self.recording = None
+
+    def fill(self, value):
+        self.recording.add(False, [0x2C])
+        self.recording.add(True, [value] * 4)
+
+    def replay(self, display_list):
+        self.replayed.append(display_list)
+
+
+def test_cache_records_once_and_persists(tmp_path):
+    builds = []
+
+    def build(display):
+        builds.append(display)
+        display.fill(0xAA)
+
+    display = FakeDisplay()
+    DisplayListCache(display, str(tmp_path)).show("splash", build)
+    DisplayListCache(display, str(tmp_path)).show("splash", build)
+
+    assert len(builds) == 1
+    assert display.replayed[0].segments == display.replayed[1].segments
+
+
+def test_cache_rebuilds_damaged_file(tmp_path):
+    display = FakeDisplay()
+    cache = DisplayListCache(display, str(tmp_path))
+    cache.get("splash", lambda d: d.fill(0xAA))
+    path = cache._path("splash")
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 2)
+
+    rebuilt = DisplayListCache(display, str(tmp_path)).get(
+        "splash", lambda d: d.fill(0x55)
+    )
+    assert rebuilt.segments[-1] == (True, bytearray([0x55] * 4))
+    assert DisplayList.load(path).segments == rebuilt.segments
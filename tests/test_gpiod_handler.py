@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+import GpiodHandler as backend
+from GpiodHandler import GpiodHandler
+
+# Runs against a gpio-sim chip created through configfs (needs root, the
+# gpio-sim module and configfs mounted); skipped when that is not available.
+CONFIGFS = "/sys/kernel/config/gpio-sim"
+NUM_LINES = 32
+TP_CS = 7
+TP_IRQ = 17
+
+
+def _write(path, value):
+    with open(path, "w") as f:
+        f.write(value)
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _remove_chip(device, bank):
+    live = os.path.join(device, "live")
+    if os.path.exists(live) and _read(live) == "1":
+        _write(live, "0")
+    for path in (bank, device):
+        if os.path.isdir(path):
+            os.rmdir(path)
+
+
+@pytest.fixture
+def sim_chip():
+    """Yield (device path, sysfs directory of the sim lines) for a live chip."""
+    if not os.path.isdir(CONFIGFS):
+        pytest.skip("gpio-sim is not available")
+
+    device = os.path.join(CONFIGFS, f"lcddriver-test-{os.getpid()}")
+    bank = os.path.join(device, "bank0")
+    try:
+        os.mkdir(device)
+        os.mkdir(bank)
+        _write(os.path.join(bank, "num_lines"), str(NUM_LINES))
+        _write(os.path.join(device, "live"), "1")
+    except OSError as e:
+        _remove_chip(device, bank)
+        pytest.skip(f"cannot create a gpio-sim chip: {e}")
+
+    chip = _read(os.path.join(bank, "chip_name"))
+    platform_device = _read(os.path.join(device, "dev_name"))
+    lines = os.path.join("/sys/devices/platform", platform_device, chip)
+    try:
+        yield f"/dev/{chip}", lines
+    finally:
+        _remove_chip(device, bank)
+
+
+@pytest.fixture
+def gpio(sim_chip):
+    handler = GpiodHandler(chip=sim_chip[0])
+    yield handler
+    handler.cleanup()
+
+
+def sim_value(sim_chip, offset):
+    return int(_read(os.path.join(sim_chip[1], f"sim_gpio{offset}", "value")))
+
+
+def set_sim_pull(sim_chip, offset, pull):
+    _write(os.path.join(sim_chip[1], f"sim_gpio{offset}", "pull"), pull)
+
+
+def count_set_values(monkeypatch):
+    """Patch ioctl to record the fd of every SET_VALUES call."""
+    calls = []
+    ioctl = backend.fcntl.ioctl
+
+    def counting_ioctl(fd, request, *args):
+        if request == backend.GPIO_V2_LINE_SET_VALUES_IOCTL:
+            calls.append(fd)
+        return ioctl(fd, request, *args)
+
+    monkeypatch.setattr(backend.fcntl, "ioctl", counting_ioctl)
+    return calls
+
+
+def test_outputs_start_high(gpio, sim_chip):
+    for pin in (gpio.cs_pin, gpio.rs_pin, gpio.rst_pin):
+        assert sim_value(sim_chip, pin) == 1
+
+
+def test_set_pin(gpio, sim_chip):
+    gpio.set_pin(gpio.rst_pin, 0)
+    assert sim_value(sim_chip, gpio.rst_pin) == 0
+    assert sim_value(sim_chip, gpio.cs_pin) == 1
+
+
+def test_set_pins_is_one_ioctl(gpio, sim_chip, monkeypatch):
+    calls = count_set_values(monkeypatch)
+    gpio.set_pins({gpio.rs_pin: 0, gpio.cs_pin: 0})
+
+    assert len(calls) == 1
+    assert sim_value(sim_chip, gpio.rs_pin) == 0
+    assert sim_value(sim_chip, gpio.cs_pin) == 0
+    assert sim_value(sim_chip, gpio.rst_pin) == 1
+
+
+def test_set_pins_groups_by_request(gpio, sim_chip, monkeypatch):
+    gpio.setup_output(TP_CS, initial=1)
+    assert sim_value(sim_chip, TP_CS) == 1
+
+    calls = count_set_values(monkeypatch)
+    gpio.set_pins({gpio.rs_pin: 1, gpio.cs_pin: 0, TP_CS: 0})
+
+    assert len(calls) == 2
+    assert sim_value(sim_chip, gpio.cs_pin) == 0
+    assert sim_value(sim_chip, TP_CS) == 0
+
+
+def test_falling_edge_events(gpio, sim_chip):
+    line = gpio.request_edge_events(TP_IRQ, falling=True, pull_up=True)
+    assert line.read() == 1
+    assert not line.wait(timeout=0.05)
+
+    set_sim_pull(sim_chip, TP_IRQ, "pull-down")
+    assert line.wait(timeout=1.0)
+    events = line.read_events()
+    assert len(events) == 1
+    assert events[0][1]  # Falling edge
+    assert line.read() == 0
+
+    # Only falling edges were requested
+    set_sim_pull(sim_chip, TP_IRQ, "pull-up")
+    assert not line.wait(timeout=0.1)
+    assert line.read() == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from color import pack_pixels
+from const import PixelFormat
+from indexed_surface import IndexedSurface
+
+
+class FakeDisplay:
+    def __init__(self, pixel_format):
+        self.pixel_format = pixel_format
+        self.writes = []
+
+    def blit(self, x, y, pixels):
+        h, w = pixels.shape
+        self.writes.append((x, y, w, h, pack_pixels(pixels, self.pixel_format)))
+
+    def draw_buffer(self, x, y, w, h, data):
+        self.writes.append((x, y, w, h, bytes(data)))
+
+
+def sample_surface():
+    rng = np.random.default_rng(1)
+    palette = rng.integers(0, 0x10000, 256, dtype=np.uint16)
+    surface = IndexedSurface(40, 30, palette)
+    surface.pixels[:] = rng.integers(0, 256, (30, 40), dtype=np.uint8)
+    return surface
+
+
+@pytest.mark.parametrize(
+    "pixel_format", [PixelFormat.RGB565, PixelFormat.RGB666, PixelFormat.RGB444]
+)
+def test_flush_matches_packed_palette_lookup(pixel_format):
+    surface = sample_surface()
+    display = FakeDisplay(pixel_format)
+    assert surface.flush(display) == 1
+
+    x, y, w, h, data = display.writes[0]
+    assert (x, y, w, h) == (0, 0, 40, 30)
+    assert data == pack_pixels(surface.palette[surface.pixels], pixel_format)
+
+
+def test_flush_sends_only_damage():
+    surface = sample_surface()
+    display = FakeDisplay(PixelFormat.RGB565)
+    surface.flush(display)
+    display.writes.clear()
+
+    surface.fill_rect(-5, -5, 10, 10, 7)
+    assert surface.flush(display) == 1
+    x, y, w, h, data = display.writes[0]
+    assert (x, y, w, h) == (0, 0, 5, 5)
+    assert data == pack_pixels(surface.palette[surface.pixels[:5, :5]])
+    assert surface.flush(display) == 0
+
+
+def test_set_palette_damages_only_tiles_using_the_index():
+    surface = IndexedSurface(64, 64)
+    surface.pixels[20, 40] = 5  # Tile (row 1, col 2)
+    surface.pixels[50, 3] = 5  # Tile (row 3, col 0)
+    surface.damage = []
+
+    surface.set_palette({5: 0xF800})
+    assert sorted(surface.damage) == [(0, 48, 16, 16), (32, 16, 16, 16)]
+
+
+def test_set_palette_unchanged_color_damages_nothing():
+    surface = IndexedSurface(64, 64, palette=[0, 0xF800])
+    surface.pixels[:] = 1
+    surface.damage = []
+
+    surface.set_palette({1: 0xF800})
+    assert surface.damage == []
+
+
+def test_set_palette_new_colors_are_flushed():
+    surface = IndexedSurface(16, 16)
+    surface.pixels[:] = 3
+    display = FakeDisplay(PixelFormat.RGB565)
+    surface.flush(display)
+
+    surface.set_palette({3: 0x07E0})
+    surface.flush(display)
+    assert display.writes[-1][4] == bytes([0x07, 0xE0]) * 256
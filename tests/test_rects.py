@@ -0,0 +1,40 @@
+from rects import intersect_rects, merge_rects
+
+
+def test_intersect_rects():
+    assert intersect_rects((0, 0, 10, 10), (5, 5, 10, 10)) == (5, 5, 5, 5)
+    assert intersect_rects((-5, -5, 20, 20), (0, 0, 240, 320)) == (0, 0, 15, 15)
+    assert intersect_rects((0, 0, 10, 10), (20, 20, 5, 5)) is None
+
+
+def test_intersect_rects_edge_contact_is_empty():
+    assert intersect_rects((0, 0, 10, 10), (10, 0, 10, 10)) is None
+
+
+def test_merge_overlapping_rects():
+    assert merge_rects([(0, 0, 10, 10), (5, 5, 10, 10)]) == [(0, 0, 15, 15)]
+
+
+def test_merge_touching_rects():
+    assert merge_rects([(0, 0, 10, 10), (10, 0, 10, 10)]) == [(0, 0, 20, 10)]
+
+
+def test_separate_rects_are_kept():
+    rects = [(0, 0, 10, 10), (50, 50, 10, 10)]
+    assert sorted(merge_rects(rects)) == rects
+
+
+def test_merge_is_transitive():
+    # The third rect bridges the first two
+    rects = [(0, 0, 10, 10), (30, 0, 10, 10), (8, 0, 24, 5)]
+    assert merge_rects(rects) == [(0, 0, 40, 10)]
+
+
+def test_too_many_rects_collapse_to_bounds():
+    rects = [(x * 20, 0, 5, 5) for x in range(5)]
+    assert len(merge_rects(rects, max_rects=5)) == 5
+    assert merge_rects(rects, max_rects=4) == [(0, 0, 85, 5)]
+
+
+def test_merge_empty():
+    assert merge_rects([]) == []
@@ -0,0 +1,41 @@
+import pytest
+
+from shared_framebuffer import SharedFramebuffer
+
+
+@pytest.fixture
+def framebuffer():
+    framebuffer = SharedFramebuffer(240, 320)
+    yield framebuffer
+    framebuffer.close()
+
+
+def test_publish_whole_frame_by_default(framebuffer):
+    assert framebuffer.publish() == 1
+    assert framebuffer.take() == (1, [(0, 0, 240, 320)])
+    assert framebuffer.take() is None
+
+
+def test_rects_are_clipped(framebuffer):
+    framebuffer.publish([(-5, -5, 20, 20), (230, 310, 50, 50)])
+    assert framebuffer.take() == (1, [(0, 0, 15, 15), (230, 310, 10, 10)])
+
+
+def test_offscreen_rects_publish_nothing(framebuffer):
+    assert framebuffer.publish([(500, 500, 10, 10), (0, 0, 0, 10)]) == 0
+    assert framebuffer.take() is None
+
+
+def test_untaken_rects_are_merged(framebuffer):
+    framebuffer.publish([(0, 0, 10, 10)])
+    framebuffer.publish([(100, 100, 10, 10)])
+    sequence, rects = framebuffer.take()
+    assert sequence == 2
+    assert sorted(rects) == [(0, 0, 10, 10), (100, 100, 10, 10)]
+
+
+def test_wait_flushed(framebuffer):
+    sequence = framebuffer.publish()
+    assert not framebuffer.wait_flushed(sequence, timeout=0.01)
+    framebuffer.mark_flushed(sequence)
+    assert framebuffer.wait_flushed(sequence, timeout=0.01)
@@ -0,0 +1,54 @@
+import threading
+from queue import Queue
+
+import pytest
+
+pytest.importorskip("spidev")
+
+from SPIHandler import SPIHandler
+
+
+class FakeSpiDev:
+    max_speed_hz = 10_000_000
+
+    def xfer2(self, data, speed=None):
+        if data == [0xFF]:
+            raise OSError("transfer failed")
+        return [0xA5] * len(data)
+
+    def writebytes2(self, data):
+        raise OSError("transfer failed")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def handler():
+    # Built without __init__ so no /dev/spidev device is opened
+    handler = SPIHandler.__new__(SPIHandler)
+    handler.spi = FakeSpiDev()
+    handler.spi_queue = Queue()
+    handler.spi_lock = threading.Lock()
+    handler.bus_lock = threading.RLock()
+    handler.spi_worker_thread = threading.Thread(target=handler.spi_worker, daemon=True)
+    handler.spi_worker_thread.start()
+    yield handler
+    handler.close()
+
+
+def test_worker_errors_reach_the_caller(handler):
+    with pytest.raises(OSError):
+        handler.write([0xFF])
+    with pytest.raises(OSError):
+        handler.read([0xFF])
+    with pytest.raises(OSError):
+        handler.write_stream([(True, b"\x00")], lambda is_data: None)
+    with pytest.raises(ValueError):
+        handler.write("not bytes")
+
+
+def test_worker_keeps_running_after_an_error(handler):
+    with pytest.raises(OSError):
+        handler.write([0xFF])
+    assert handler.read([0x00, 0x00]) == [0xA5, 0xA5]
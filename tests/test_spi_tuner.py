@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from color import pack_pixels
+from const import PixelFormat
+from spi_tuner import (
+    DEFAULT_SPEEDS,
+    _count_errors,
+    apply_tuned_speed,
+    load_tuned_speed,
+    save_tuned_speed,
+    tune_spi_speed,
+)
+
+
+class FakeSPI:
+    def __init__(self, speed=10_000_000):
+        self.spi = SimpleNamespace(max_speed_hz=speed)
+        self.bus = 0
+        self.device = 0
+
+    def set_speed(self, speed):
+        self.spi.max_speed_hz = speed
+
+
+class FakePanel:
+    """Frame memory that corrupts writes made above `max_clean_speed`."""
+
+    def __init__(self, max_clean_speed, readback=True):
+        self.spi = FakeSPI()
+        self.pixel_format = PixelFormat.RGB565
+        self.max_clean_speed = max_clean_speed
+        self.readback = readback
+        self.memory = None
+
+    def blit(self, x, y, pixels):
+        self.memory = np.asarray(pixels, dtype=np.uint16).ravel().copy()
+        if self.spi.spi.max_speed_hz > self.max_clean_speed:
+            self.memory[::7] ^= 0x0100
+
+    def read_memory(self, x, y, w, h):
+        if not self.readback:
+            return []
+        # RAMRD reports 6-bit channels left-aligned, the RGB666 wire layout
+        return list(pack_pixels(self.memory, PixelFormat.RGB666))
+
+
+def readback_of(pixels):
+    return list(pack_pixels(pixels, PixelFormat.RGB666))
+
+
+def test_count_errors_exact_readback():
+    written = np.array([0x0000, 0xFFFF, 0xF800, 0x1234], dtype=np.uint16)
+    assert _count_errors(written, readback_of(written), PixelFormat.RGB565) == 0
+
+
+def test_count_errors_counts_pixels_not_bits():
+    written = np.array([0x0000, 0xFFFF, 0xF800, 0x1234], dtype=np.uint16)
+    readback = readback_of(written)
+    readback[0] = 0xF8  # Every channel of pixel 1 is off
+    readback[3:6] = [0, 0, 0]
+    assert _count_errors(written, readback, PixelFormat.RGB565) == 2
+
+
+def test_count_errors_short_readback_fails_every_pixel():
+    written = np.zeros(4, dtype=np.uint16)
+    assert _count_errors(written, [0] * 6, PixelFormat.RGB565) == 4
+    assert _count_errors(written, [], PixelFormat.RGB565) == 4
+
+
+def test_count_errors_rgb444_ignores_dropped_bits():
+    written = np.array([0xFFFF], dtype=np.uint16)
+    readback = [0xF0, 0xF0, 0xF0]  # What the panel holds after a 12-bit write
+    assert _count_errors(written, readback, PixelFormat.RGB565) == 1
+    assert _count_errors(written, readback, PixelFormat.RGB444) == 0
+
+
+def test_tune_finds_highest_clean_speed_and_backs_off():
+    panel = FakePanel(max_clean_speed=25_000_000)
+    speed = tune_spi_speed(panel, trials=1)
+    assert speed == 20_000_000  # 25 MHz is the edge, one step of margin
+    assert panel.spi.spi.max_speed_hz == speed
+
+
+def test_tune_without_margin():
+    panel = FakePanel(max_clean_speed=25_000_000)
+    assert tune_spi_speed(panel, margin=0, trials=1) == 25_000_000
+
+
+def test_tune_everything_clean():
+    panel = FakePanel(max_clean_speed=10**9)
+    assert tune_spi_speed(panel, margin=0, trials=1) == max(DEFAULT_SPEEDS)
+
+
+def test_tune_gives_up_without_readback():
+    panel = FakePanel(max_clean_speed=10**9, readback=False)
+    assert tune_spi_speed(panel, trials=1) is None
+    assert panel.spi.spi.max_speed_hz == 10_000_000
+
+
+def test_tuned_speed_is_stored_per_device(tmp_path):
+    path = str(tmp_path / "spi_speed.json")
+    first, second = FakeSPI(), FakeSPI()
+    second.device = 1
+
+    assert load_tuned_speed(first, path) is None
+    save_tuned_speed(first, 20_000_000, path)
+    save_tuned_speed(second, 32_000_000, path)
+    assert load_tuned_speed(first, path) == 20_000_000
+    assert load_tuned_speed(second, path) == 32_000_000
+
+
+def test_apply_tunes_once_and_reuses_the_result(tmp_path):
+    path = str(tmp_path / "spi_speed.json")
+    panel = FakePanel(max_clean_speed=25_000_000)
+    assert apply_tuned_speed(panel, path) == 20_000_000
+
+    panel = FakePanel(max_clean_speed=0)  # Would fail any new tuning
+    assert apply_tuned_speed(panel, path) == 20_000_000
+    assert panel.spi.spi.max_speed_hz == 20_000_000
+
+
+def test_apply_without_readback_saves_current_speed(tmp_path):
+    path = str(tmp_path / "spi_speed.json")
+    panel = FakePanel(max_clean_speed=10**9, readback=False)
+    assert apply_tuned_speed(panel, path) == 10_000_000
+    assert load_tuned_speed(panel.spi, path) == 10_000_000
+
+    # A board that gets fixed later can still be tuned on request
+    panel.readback = True
+    assert apply_tuned_speed(panel, path, retune=True) > 10_000_000
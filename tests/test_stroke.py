@@ -0,0 +1,91 @@
+import numpy as np
+
+from stroke import spans_to_rects, stroke_spans
+
+
+def coverage(rects, width, height):
+    image = np.zeros((height, width), dtype=np.uint8)
+    for x, y, w, h in rects:
+        image[y : y + h, x : x + w] += 1
+    return image
+
+
+def capsule_mask(points, radius, width, height):
+    """Brute-force reference: pixels within `radius` of the polyline."""
+    ys, xs = np.mgrid[0:height, 0:width]
+    grid = np.stack([xs, ys], axis=-1).astype(float)
+    points = np.asarray(points, dtype=float)
+    distance = np.min([np.hypot(*(grid - p).T).T for p in points], axis=0)
+    for a, b in zip(points[:-1], points[1:]):
+        d = b - a
+        t = np.clip((grid - a) @ d / (d @ d), 0, 1)
+        closest = a + t[..., None] * d
+        distance = np.minimum(distance, np.hypot(*(grid - closest).T).T)
+    return distance <= radius
+
+
+def test_single_point_is_a_disc():
+    rows = stroke_spans([(10, 10)], 2, 40, 40)
+    assert rows == {
+        8: [(10, 10)],
+        9: [(9, 11)],
+        10: [(8, 12)],
+        11: [(9, 11)],
+        12: [(10, 10)],
+    }
+
+
+def test_horizontal_stroke_has_one_span_per_row():
+    rows = stroke_spans([(50, 100), (100, 100)], 3, 240, 320)
+    assert sorted(rows) == list(range(97, 104))
+    assert all(len(spans) == 1 for spans in rows.values())
+    # Straight top and bottom edges across the whole segment
+    assert rows[97] == rows[103] == [(50, 100)]
+    assert rows[100] == [(47, 103)]
+
+
+def test_horizontal_stroke_needs_few_rects():
+    rects = spans_to_rects(stroke_spans([(50, 100), (100, 100)], 3, 240, 320))
+    assert len(rects) == 5
+
+
+def test_matches_capsule_reference():
+    rng = np.random.default_rng(9340)
+    for _ in range(50):
+        points = rng.uniform(0, 40, size=(rng.integers(1, 5), 2))
+        radius = int(rng.integers(1, 6))
+        rects = spans_to_rects(stroke_spans(points, radius, 40, 40))
+        expected = capsule_mask(points, radius, 40, 40)
+        assert np.array_equal(coverage(rects, 40, 40) > 0, expected)
+
+
+def test_spans_are_disjoint_and_rects_do_not_overlap():
+    points = [(5, 5), (30, 20), (10, 35), (35, 35)]
+    rows = stroke_spans(points, 4, 40, 40)
+    for spans in rows.values():
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            assert start > end + 1
+    assert coverage(spans_to_rects(rows), 40, 40).max() == 1
+
+
+def test_clipped_to_screen():
+    rows = stroke_spans([(-2, -2), (3, 3)], 3, 10, 10)
+    assert min(rows) == 0
+    assert all(x0 >= 0 for spans in rows.values() for x0, _ in spans)
+    assert stroke_spans([(-20, -20)], 3, 10, 10) == {}
+
+
+def test_spans_to_rects_stacks_identical_spans():
+    rows = {
+        0: [(0, 4)],
+        1: [(0, 4)],
+        2: [(1, 3)],
+        3: [(0, 4)],
+        5: [(0, 4)],
+    }
+    assert sorted(spans_to_rects(rows)) == [
+        (0, 0, 5, 2),
+        (0, 3, 5, 1),
+        (0, 5, 5, 1),
+        (1, 2, 3, 1),
+    ]
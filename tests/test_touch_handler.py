@@ -0,0 +1,46 @@
+from touch_handler import XPT2046
+
+
+class FakeLine:
+    def read(self):
+        return 1
+
+
+class FakeGpiod:
+    """Stands in for GpiodHandler, so RPi.GPIO is never imported."""
+
+    def setup_output(self, pin, initial=1):
+        pass
+
+    def set_pin(self, pin, value):
+        pass
+
+    def request_edge_events(self, pin, falling=True, pull_up=True):
+        return FakeLine()
+
+
+def make_touch():
+    return XPT2046(gpio_handler=FakeGpiod(), self_test=False)
+
+
+def test_calibration_round_trip_creates_directory(tmp_path):
+    path = str(tmp_path / "lcddriver" / "touch_calibration.json")
+    touch = make_touch()
+    touch.x_min, touch.x_max, touch.y_min, touch.y_max = 200, 3800, 250, 3700
+    assert touch.save_calibration(path)
+
+    loaded = make_touch()
+    assert loaded.load_calibration(path)
+    assert (loaded.x_min, loaded.x_max, loaded.y_min, loaded.y_max) == (
+        200,
+        3800,
+        250,
+        3700,
+    )
+
+
+def test_save_calibration_reports_failure(tmp_path):
+    blocker = tmp_path / "lcddriver"
+    blocker.write_text("not a directory")
+    touch = make_touch()
+    assert not touch.save_calibration(str(blocker / "touch_calibration.json"))
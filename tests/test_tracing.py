@@ -0,0 +1,74 @@
+import json
+import threading
+
+from tracing import NULL_SPAN, Tracer
+
+
+def test_disabled_tracer_hands_out_null_span():
+    tracer = Tracer(capacity=8)
+    span = tracer.span("spi.xfer", "spi")
+    assert span is NULL_SPAN
+    with span:
+        pass
+    assert tracer.snapshot() == []
+
+
+def test_span_records_when_enabled():
+    tracer = Tracer(capacity=8)
+    tracer.enable()
+    with tracer.span("spi.xfer", "spi"):
+        pass
+
+    ((name, category, start, duration, tid),) = tracer.snapshot()
+    assert (name, category) == ("spi.xfer", "spi")
+    assert duration >= 0
+    assert tid == threading.get_ident()
+
+
+def test_ring_buffer_keeps_newest_spans():
+    tracer = Tracer(capacity=4)
+    tracer.enable()
+    for i in range(10):
+        tracer.record(f"span{i}", "test", 1000 * i, 10)
+
+    assert [event[0] for event in tracer.snapshot()] == [
+        "span6",
+        "span7",
+        "span8",
+        "span9",
+    ]
+
+
+def test_enable_with_new_capacity_clears():
+    tracer = Tracer(capacity=4)
+    tracer.enable()
+    tracer.record("old", "test", 0, 1)
+    tracer.enable(capacity=16)
+    assert tracer.capacity == 16
+    assert tracer.snapshot() == []
+
+
+def test_chrome_trace_shape(tmp_path):
+    tracer = Tracer(capacity=8)
+    tracer.enable()
+    tracer.record("display.blit", "display", 2_000_000, 500_000)
+
+    path = str(tmp_path / "trace.json")
+    tracer.dump(path)
+    with open(path) as f:
+        trace = json.load(f)
+
+    assert trace["displayTimeUnit"] == "ms"
+    metadata, span = trace["traceEvents"]
+    assert metadata["ph"] == "M"
+    assert metadata["name"] == "thread_name"
+    assert metadata["args"] == {"name": threading.current_thread().name}
+    assert span == {
+        "name": "display.blit",
+        "cat": "display",
+        "ph": "X",
+        "ts": 2000.0,
+        "dur": 500.0,
+        "pid": metadata["pid"],
+        "tid": metadata["tid"],
+    }
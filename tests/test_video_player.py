@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from const import PixelFormat
+from video_player import RawVideo, VideoPlayer
+
+SIZE = 16
+FRAME_BYTES = SIZE * SIZE * 2
+
+
+class FakeDisplay:
+    def __init__(self, delay=0.0, fail_at=None):
+        self.delay = delay
+        self.fail_at = fail_at
+        self.frames = []
+
+    def draw_buffer(self, x, y, w, h, data):
+        if len(self.frames) == self.fail_at:
+            raise OSError("transfer failed")
+        self.frames.append(bytes(data))
+        # The first frame is slow, e.g. a stalled bus
+        if len(self.frames) == 1:
+            time.sleep(self.delay)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.raw"
+    # Frame n is filled with byte n so frames can be told apart
+    path.write_bytes(b"".join(bytes([n]) * FRAME_BYTES for n in range(20)))
+    video = RawVideo(str(path), SIZE, SIZE, PixelFormat.RGB565)
+    yield video
+    video.close()
+
+
+def test_frames_are_shown_in_order_at_the_target_rate(video):
+    display = FakeDisplay()
+    player = VideoPlayer(display, video, fps=100)
+
+    started = time.monotonic()
+    stats = player.play()
+    elapsed = time.monotonic() - started
+
+    assert stats["frames_shown"] == 20
+    assert stats["frames_skipped"] == 0
+    assert display.frames == [bytes([n]) * FRAME_BYTES for n in range(20)]
+    # 19 frame intervals after the first frame at 100 FPS
+    assert elapsed >= 19 / 100
+
+
+def test_late_frames_are_skipped(video):
+    display = FakeDisplay(delay=0.1)
+    stats = VideoPlayer(display, video, fps=100).play()
+
+    assert stats["frames_skipped"] > 0
+    assert stats["frames_shown"] + stats["frames_skipped"] == 20
+    # The player catches up and shows the last frame
+    assert display.frames[-1] == bytes([19]) * FRAME_BYTES
+
+
+def test_display_error_stops_the_prefetcher(video):
+    player = VideoPlayer(FakeDisplay(fail_at=3), video, fps=1000, prefetch=2)
+    with pytest.raises(OSError):
+        player.play(loops=None)
+    assert not player.prefetch_thread.is_alive()
+
+    # A later play() starts from the first frame again
+    display = FakeDisplay()
+    player.display = display
+    player.fps = 100
+    stats = player.play()
+    assert display.frames[0] == bytes([0]) * FRAME_BYTES
+    assert stats["frames_shown"] + stats["frames_skipped"] == 20
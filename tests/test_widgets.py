@@ -0,0 +1,126 @@
+import numpy as np
+
+from widgets import Button, Gauge, Image, Label, Screen, text_size
+
+
+class FakeDisplay:
+    width = 240
+    height = 320
+
+    def __init__(self):
+        self.blits = []
+
+    def blit(self, x, y, pixels):
+        self.blits.append((x, y, pixels.shape[1], pixels.shape[0]))
+
+
+def rendered_screen(*widgets):
+    display = FakeDisplay()
+    screen = Screen(display)
+    for widget in widgets:
+        screen.add(widget)
+    screen.render()
+    display.blits.clear()
+    return display, screen
+
+
+def test_empty_label_grows_with_text():
+    label = Label(10, 10)
+    display, screen = rendered_screen(label)
+
+    label.text = "hello"
+    assert label.rect == (10, 10) + text_size("hello")
+    assert screen.render() == 1
+    assert display.blits == [(10, 10, 30, 7)]
+    assert screen.widget_at(35, 12) is label
+
+
+def test_label_shrink_redraws_old_area():
+    label = Label(10, 10, "hello")
+    display, screen = rendered_screen(label)
+
+    label.text = "hi"
+    assert label.width == 12
+    screen.render()
+    assert display.blits == [(10, 10, 30, 7)]
+    assert screen.widget_at(35, 12) is None
+
+
+def test_fixed_width_label_keeps_its_size():
+    label = Label(0, 0, "a", width=50)
+    rendered_screen(label)
+    label.text = "a much longer text"
+    assert label.rect == (0, 0, 50, 7)
+
+
+def test_button_keeps_its_size():
+    button = Button(0, 0, 40, 20, "ok")
+    rendered_screen(button)
+    button.text = "cancel"
+    assert button.rect == (0, 0, 40, 20)
+
+
+def test_gauge_damages_only_changed_strip():
+    gauge = Gauge(0, 0, 100, 10)
+    display, screen = rendered_screen(gauge)
+
+    gauge.value = 30
+    screen.render()
+    assert display.blits == [(0, 0, 30, 10)]
+
+
+def test_touch_goes_to_topmost_widget():
+    pressed = []
+    bottom = Button(0, 0, 50, 50, on_press=lambda b: pressed.append("bottom"))
+    top = Button(20, 20, 50, 50, on_press=lambda b: pressed.append("top"))
+    _, screen = rendered_screen(bottom, top)
+
+    screen.handle_touch((30, 30))
+    screen.handle_touch((5, 5))
+    assert pressed == ["top", "bottom"]
+
+
+def test_image_takes_size_of_new_pixels():
+    image = Image(0, 0, np.zeros((10, 10), dtype=np.uint16))
+    display, screen = rendered_screen(image)
+
+    image.set_pixels(np.ones((5, 5), dtype=np.uint16))
+    assert image.rect == (0, 0, 5, 5)
+    screen.render()
+    assert display.blits == [(0, 0, 10, 10)]
+
+    display.blits.clear()
+    image.set_pixels(np.ones((20, 30), dtype=np.uint16))
+    screen.render()
+    assert display.blits == [(0, 0, 30, 20)]
+
+
+def test_color_changes_redraw_the_widget():
+    label = Label(0, 0, "hi")
+    button = Button(0, 20, 40, 20, "ok")
+    gauge = Gauge(0, 50, 100, 10, value=50)
+    display, screen = rendered_screen(label, button, gauge)
+
+    for widget, name in [
+        (label, "color"),
+        (label, "background"),
+        (button, "border"),
+        (gauge, "color"),
+    ]:
+        setattr(widget, name, 0xF800)
+        assert screen.render() == 1
+        assert display.blits[-1] == widget.rect
+        # Setting the same value again damages nothing
+        setattr(widget, name, 0xF800)
+        assert screen.render() == 0
+
+
+def test_move_reindexes_and_redraws_both_areas():
+    button = Button(0, 0, 20, 20)
+    display, screen = rendered_screen(button)
+
+    button.move(100, 100)
+    assert screen.widget_at(5, 5) is None
+    assert screen.widget_at(105, 105) is button
+    screen.render()
+    assert sorted(display.blits) == [(0, 0, 20, 20), (100, 100, 20, 20)]
@@ -1,9 +1,16 @@
-import RPi.GPIO as GPIO
+import json
+import os
 import time
 import threading
 from queue import Queue
 import queue
 
+from tracing import tracer
+
+# Pin levels, as taken by both RPi.GPIO and the gpiod backend
+LOW = 0
+HIGH = 1
+
 
 class XPT2046:
     """
@@ -29,39 +36,77 @@ class XPT2046:
         y_min=150,
         y_max=3900,
         rotate=False,
+        gpio_handler=None,
+        self_test=True,
+        spi_speed=None,
+        track_drag=False,
     ):
-        # Set up GPIO mode right at the beginning
-        if GPIO.getmode() != GPIO.BCM:
-            GPIO.setmode(GPIO.BCM)
+        # Optional character-device backend (GpiodHandler); RPi.GPIO otherwise
+        self.gpio_handler = gpio_handler
+        self.use_gpiod = hasattr(gpio_handler, "request_edge_events")
+
+        # RPi.GPIO is imported only when used, so the gpiod backend runs
+        # on systems without it
+        self.rpi_gpio = None
+        if not self.use_gpiod:
+            import RPi.GPIO
+
+            self.rpi_gpio = RPi.GPIO
+
+            # Set up GPIO mode right at the beginning
+            if self.rpi_gpio.getmode() != self.rpi_gpio.BCM:
+                self.rpi_gpio.setmode(self.rpi_gpio.BCM)
 
         self.tp_cs = tp_cs
         self.tp_irq = tp_irq
         self.spi_handler = spi_handler
         self.spi_lock = getattr(self.spi_handler, "spi_lock", None)
+        # Shared with the display so a touch read never lands inside an LCD
+        # transaction (CS low to CS high) on the same bus
+        self.bus_lock = getattr(self.spi_handler, "bus_lock", None) or threading.RLock()
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.rotate = rotate
 
+        # Per-transfer clock for the touch controller (XPT2046 DCLK is 2 MHz
+        # max); None uses whatever speed the shared bus is set to
+        self.spi_speed = spi_speed
+
+        # Keep sampling and calling back while the finger stays down, instead
+        # of one callback per press (needed for drawing strokes)
+        self.track_drag = track_drag
+
         # Calibration parameters
         self.x_min = x_min
         self.x_max = x_max
         self.y_min = y_min
         self.y_max = y_max
 
-        # Initialize touch panel CS pin - should be HIGH when idle
-        GPIO.setup(self.tp_cs, GPIO.OUT, initial=GPIO.HIGH)
+        if self.use_gpiod:
+            # CS as an output line, IRQ as a falling-edge event line with pull-up
+            self.gpio_handler.setup_output(self.tp_cs, initial=1)
+            self.irq_line = self.gpio_handler.request_edge_events(
+                self.tp_irq, falling=True, pull_up=True
+            )
+        else:
+            # Initialize touch panel CS pin - should be HIGH when idle
+            self.rpi_gpio.setup(self.tp_cs, self.rpi_gpio.OUT, initial=HIGH)
 
-        # Initialize touch panel IRQ pin as input with pull-up
-        GPIO.setup(self.tp_irq, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            # Initialize touch panel IRQ pin as input with pull-up
+            self.rpi_gpio.setup(
+                self.tp_irq, self.rpi_gpio.IN, pull_up_down=self.rpi_gpio.PUD_UP
+            )
+            self.irq_line = None
 
         # Read current IRQ state to verify setup
-        irq_state = GPIO.input(self.tp_irq)
+        irq_state = self._irq_state()
         print(f"Touch IRQ initial state: {irq_state} (HIGH=not touched, LOW=touched)")
 
         # For touch detection
         self.callback = None
         self.running = False
         self.touch_thread = None
+        self.irq_thread = None
         self.touch_queue = Queue()
 
         # For debouncing
@@ -70,8 +115,22 @@ class XPT2046:
 
         print(f"Touch controller initialized. CS pin: {tp_cs}, IRQ pin: {tp_irq}")
 
-        # Test SPI communication
-        self._test_spi()
+        # Test SPI communication (skip for fast startup)
+        if self_test:
+            self._test_spi()
+
+    def _set_cs(self, value):
+        """Drive the touch controller CS pin."""
+        if self.use_gpiod:
+            self.gpio_handler.set_pin(self.tp_cs, value)
+        else:
+            self.rpi_gpio.output(self.tp_cs, value)
+
+    def _irq_state(self):
+        """Read the IRQ pin level (LOW while touched)."""
+        if self.use_gpiod:
+            return self.irq_line.read()
+        return self.rpi_gpio.input(self.tp_irq)
 
     def _test_spi(self):
         """Test SPI communication with the touch controller"""
@@ -98,38 +157,43 @@ class XPT2046:
 
     def _read_adc(self, command):
         """Read ADC value from touch controller."""
-        # Pull CS low to start transmission
-        GPIO.output(self.tp_cs, GPIO.LOW)
-        time.sleep(0.001)  # Small delay for stability
-
         # Buffer for the response
         result = [0, 0]
 
-        try:
-            # Direct SPI access for better control
-            if hasattr(self.spi_handler, "spi") and hasattr(
-                self.spi_handler.spi, "xfer2"
-            ):
-                # Direct spidev access - IMPORTANT FIX: Changed from 3 bytes to 2 bytes
-                tx_data = [command, 0x00]  # Send command and one dummy byte
-                rx_data = self.spi_handler.spi.xfer2(tx_data)
-                if len(rx_data) >= 2:
-                    result = rx_data  # Store the full result for debugging
-                    # Note: First byte may be junk from sending the command
-            else:
-                # Use SPI handler methods
-                if self.spi_lock:
-                    with self.spi_lock:
+        # The bus is held only from CS low to CS high. The XPT2046 samples
+        # during the command's acquisition clocks, so no settle delay is
+        # needed with CS asserted and the display is never stalled by one
+        with self.bus_lock:
+            # Pull CS low to start transmission
+            self._set_cs(LOW)
+            try:
+                # Direct SPI access for better control
+                if hasattr(self.spi_handler, "spi") and hasattr(
+                    self.spi_handler.spi, "xfer2"
+                ):
+                    # Direct spidev access - IMPORTANT FIX: Changed from 3 bytes to 2 bytes
+                    tx_data = [command, 0x00]  # Send command and one dummy byte
+                    if self.spi_speed:
+                        rx_data = self.spi_handler.spi.xfer2(tx_data, self.spi_speed)
+                    else:
+                        rx_data = self.spi_handler.spi.xfer2(tx_data)
+                    if len(rx_data) >= 2:
+                        result = rx_data  # Store the full result for debugging
+                        # Note: First byte may be junk from sending the command
+                else:
+                    # Use SPI handler methods
+                    if self.spi_lock:
+                        with self.spi_lock:
+                            self.spi_handler.write([command])
+                            result = self.spi_handler.read([0x00, 0x00])
+                    else:
                         self.spi_handler.write([command])
                         result = self.spi_handler.read([0x00, 0x00])
-                else:
-                    self.spi_handler.write([command])
-                    result = self.spi_handler.read([0x00, 0x00])
-        except Exception as e:
-            print(f"SPI error in _read_adc: {e}")
-        finally:
-            # Always return CS to high when done
-            GPIO.output(self.tp_cs, GPIO.HIGH)
+            except Exception as e:
+                print(f"SPI error in _read_adc: {e}")
+            finally:
+                # Always return CS to high when done
+                self._set_cs(HIGH)
 
         if result and len(result) >= 2:
             # XPT2046 returns 12 bits of data in two bytes
@@ -219,13 +283,15 @@ class XPT2046:
         self.last_touch_time = current_time
 
         # Add a small delay to let SPI bus stabilize
-        time.sleep(0.002)
+        with tracer.span("touch.sleep", "touch"):
+            time.sleep(0.002)
 
         # Try multiple attempts to read the touch data
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                coords = self.get_touch()
+                with tracer.span("touch.read", "touch"):
+                    coords = self.get_touch()
                 if coords:
                     # We got valid coordinates
                     self.touch_queue.put(coords)
@@ -239,7 +305,8 @@ class XPT2046:
                 print(f"Error during touch read attempt {attempt + 1}: {e}")
 
             # Short delay before retry
-            time.sleep(0.005)
+            with tracer.span("touch.sleep", "touch"):
+                time.sleep(0.005)
 
         print("Failed to read valid coordinates after multiple attempts")
 
@@ -255,7 +322,8 @@ class XPT2046:
                 if coords is not None and self.callback:
                     print(f"Executing callback with coords {coords}")
                     try:
-                        self.callback(coords)
+                        with tracer.span("touch.callback", "touch"):
+                            self.callback(coords)
                         print("Callback completed successfully")
                     except Exception as e:
                         print(f"Exception in callback: {e}")
@@ -264,12 +332,20 @@ class XPT2046:
                         traceback.print_exc()
 
                 # Wait for release - but don't block too long
-                wait_start = time.time()
-                while time.time() - wait_start < 0.5:  # Max 500ms wait
-                    if GPIO.input(self.tp_irq) == GPIO.HIGH:
-                        print("Touch released (IRQ HIGH)")
-                        break
-                    time.sleep(0.01)
+                with tracer.span("touch.wait_release", "touch"):
+                    wait_start = time.time()
+                    while time.time() - wait_start < 0.5:  # Max 500ms wait
+                        if self._irq_state() == HIGH:
+                            print("Touch released (IRQ HIGH)")
+                            break
+                        if self.track_drag and self.callback:
+                            with tracer.span("touch.read", "touch"):
+                                drag = self.get_touch()
+                            if drag:
+                                with tracer.span("touch.callback", "touch"):
+                                    self.callback(drag)
+                                wait_start = time.time()  # Still pressed
+                        time.sleep(0.01)
 
                 # Mark task as done
                 self.touch_queue.task_done()
@@ -302,32 +378,55 @@ class XPT2046:
         self.touch_thread.daemon = True
         self.touch_thread.start()
 
+        if self.use_gpiod:
+            # Edge events are read from the line request fd by our own thread
+            self.irq_thread = threading.Thread(target=self._irq_event_loop)
+            self.irq_thread.daemon = True
+            self.irq_thread.start()
+            print("Touch handler started with edge event detection")
+            return
+
         try:
             # Remove any existing event detection first
-            GPIO.remove_event_detect(self.tp_irq)
+            self.rpi_gpio.remove_event_detect(self.tp_irq)
 
             # Add the new event detection - use shorter bouncetime
-            GPIO.add_event_detect(
-                self.tp_irq, GPIO.FALLING, callback=self._irq_handler, bouncetime=30
+            self.rpi_gpio.add_event_detect(
+                self.tp_irq,
+                self.rpi_gpio.FALLING,
+                callback=self._irq_handler,
+                bouncetime=30,
             )
             print("Touch handler started with interrupt detection")
 
             # Also test the IRQ pin manually
-            print(f"Current IRQ pin state: {GPIO.input(self.tp_irq)}")
+            print(f"Current IRQ pin state: {self.rpi_gpio.input(self.tp_irq)}")
         except Exception as e:
             print(f"Failed to set up interrupt: {e}")
             self.running = False
             raise
 
+    def _irq_event_loop(self):
+        """Wait on the IRQ line's edge event fd and dispatch falling edges."""
+        while self.running:
+            if not self.irq_line.wait(timeout=0.05):
+                continue
+            for _, falling in self.irq_line.read_events():
+                if falling:
+                    self._irq_handler(self.tp_irq)
+
     def stop_listening(self):
         """Stop listening for touch events."""
         self.running = False
 
         # Remove interrupt handler
-        try:
-            GPIO.remove_event_detect(self.tp_irq)
-        except:
-            pass
+        if self.irq_thread:
+            self.irq_thread.join(timeout=1.0)
+        else:
+            try:
+                self.rpi_gpio.remove_event_detect(self.tp_irq)
+            except:
+                pass
 
         # Wait for thread to finish
         if self.touch_thread:
@@ -342,7 +441,7 @@ class XPT2046:
         time.sleep(2)
 
         # Wait for touch
-        while GPIO.input(self.tp_irq) == GPIO.HIGH:
+        while self._irq_state() == HIGH:
             time.sleep(0.1)
 
         ul = self._get_touch_raw()
@@ -350,7 +449,7 @@ class XPT2046:
         time.sleep(1)
 
         # Wait for release
-        while GPIO.input(self.tp_irq) == GPIO.LOW:
+        while self._irq_state() == LOW:
             time.sleep(0.1)
         time.sleep(0.5)  # Debounce delay
 
@@ -358,14 +457,14 @@ class XPT2046:
         time.sleep(2)
 
         # Wait for touch
-        while GPIO.input(self.tp_irq) == GPIO.HIGH:
+        while self._irq_state() == HIGH:
             time.sleep(0.1)
 
         lr = self._get_touch_raw()
         print(f"Lower-right raw value: {lr}")
 
         # Wait for release
-        while GPIO.input(self.tp_irq) == GPIO.LOW:
+        while self._irq_state() == LOW:
             time.sleep(0.1)
 
         if ul and lr:
@@ -386,3 +485,44 @@ class XPT2046:
         else:
             print("Calibration failed. Using default values.")
             return False
+
+    def save_calibration(self, path):
+        """Persist the current calibration values to a JSON file. Returns success."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "x_min": self.x_min,
+                        "x_max": self.x_max,
+                        "y_min": self.y_min,
+                        "y_max": self.y_max,
+                        "rotate": self.rotate,
+                    },
+                    f,
+                )
+        except OSError as e:
+            print(f"Could not save calibration to {path}: {e}")
+            return False
+
+        print(f"Calibration saved to {path}")
+        return True
+
+    def load_calibration(self, path):
+        """Load calibration values saved by save_calibration. Returns success."""
+        try:
+            with open(path) as f:
+                values = json.load(f)
+            self.x_min = int(values["x_min"])
+            self.x_max = int(values["x_max"])
+            self.y_min = int(values["y_min"])
+            self.y_max = int(values["y_max"])
+            self.rotate = bool(values.get("rotate", self.rotate))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Could not load calibration from {path}: {e}")
+            return False
+
+        print(f"Calibration loaded from {path}")
+        return True
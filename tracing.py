@@ -0,0 +1,129 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "start")
+
+    def __init__(self, tracer, name, category):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer.record(self.name, self.category, self.start, end - self.start)
+        return False
+
+
+class Tracer:
+    """
+    Opt-in span recorder backed by a fixed-size ring buffer.
+
+    Instrumented code does `with tracer.span("spi.xfer", "spi"):`. While
+    disabled that returns a shared no-op span, so the cost left in
+    production is one attribute check and a call. Once the buffer is full
+    the oldest spans are overwritten.
+    """
+
+    def __init__(self, capacity=65536):
+        self.enabled = False
+        self.capacity = capacity
+        self.clear()
+
+    def enable(self, capacity=None):
+        if capacity and capacity != self.capacity:
+            self.capacity = capacity
+            self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events = [None] * self.capacity
+        # next() on itertools.count is atomic under the GIL, so writers on
+        # different threads never need a lock to claim a slot
+        self._counter = itertools.count()
+        self.thread_names = {}
+
+    def span(self, name, category):
+        """Context manager timing a block; free when tracing is disabled."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, category)
+
+    def record(self, name, category, start_ns, duration_ns):
+        """Record a completed span (perf_counter_ns timestamps)."""
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        slot = next(self._counter) % self.capacity
+        self.events[slot] = (name, category, start_ns, duration_ns, tid)
+
+    def snapshot(self):
+        """Recorded spans, oldest first."""
+        events = [event for event in self.events if event is not None]
+        events.sort(key=lambda event: event[2])
+        return events
+
+    def to_chrome_trace(self):
+        """Return the spans as a Chrome/Perfetto trace-event dict."""
+        pid = os.getpid()
+        trace = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self.thread_names.items()
+        ]
+        for name, category, start_ns, duration_ns, tid in self.snapshot():
+            trace.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start_ns / 1000.0,
+                    "dur": duration_ns / 1000.0,
+                    "pid": pid,
+                    "tid": tid,
+                }
+            )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        """Write a trace file that chrome://tracing or ui.perfetto.dev can load."""
+        trace = self.to_chrome_trace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        spans = sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+        print(f"Trace with {spans} spans written to {path}")
+
+
+# Shared tracer used by the display, SPI and touch modules
+tracer = Tracer()
@@ -0,0 +1,272 @@
+import mmap
+import os
+import threading
+import time
+from queue import Queue, Empty
+
+from color import wire_size
+from const import PixelFormat
+
+
+class RawVideo:
+    """
+    Memory-mapped frames of raw, panel-ready pixel data.
+
+    `path` is either a single file of back-to-back frames or a directory of
+    one-frame `.raw` files (played in sorted order). Frames are returned as
+    memoryview slices of the mapping, so nothing is decoded or copied.
+    """
+
+    def __init__(self, path, width=240, height=320, pixel_format=PixelFormat.RGB565):
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.frame_size = wire_size(width * height, pixel_format)
+        self.maps = []
+        self.frames = []
+
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith(".raw"))
+            paths = [os.path.join(path, n) for n in names]
+        else:
+            paths = [path]
+
+        for file_path in paths:
+            with open(file_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self.frame_size:
+                    print(f"Skipping {file_path}: smaller than one frame")
+                    continue
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps.append(mapped)
+            view = memoryview(mapped)
+            for offset in range(0, size - self.frame_size + 1, self.frame_size):
+                frame = view[offset : offset + self.frame_size]
+                self.frames.append((mapped, offset, frame))
+
+        if not self.frames:
+            raise ValueError(f"No frames of {width}x{height} found in {path}")
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        """Return frame `index` as a zero-copy memoryview."""
+        return self.frames[index][2]
+
+    def prefetch(self, index):
+        """Ask the kernel to start paging in frame `index`."""
+        mapped, offset, _ = self.frames[index]
+        if hasattr(mapped, "madvise"):
+            # madvise needs a page-aligned start
+            start = offset - offset % mmap.PAGESIZE
+            length = offset + self.frame_size - start
+            mapped.madvise(mmap.MADV_WILLNEED, start, length)
+
+    def close(self):
+        for _, _, view in self.frames:
+            view.release()
+        self.frames = []
+        for mapped in self.maps:
+            mapped.close()
+        self.maps = []
+
+
+class VideoPlayer:
+    """
+    Plays a RawVideo on a DisplayHandler at a target frame rate.
+
+    A prefetch thread pages frames in ahead of the playback loop. When the
+    loop falls behind schedule, late frames are dropped instead of shown.
+    """
+
+    def __init__(self, display, video, fps=30, prefetch=4, x=0, y=0):
+        self.display = display
+        self.video = video
+        self.fps = fps
+        self.x = x
+        self.y = y
+
+        self.frame_queue = Queue(maxsize=prefetch)
+        self.stop_event = threading.Event()
+        self.prefetch_thread = None
+
+        # Playback statistics
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        self.achieved_fps = 0.0
+
+    def _prefetch_worker(self, loops):
+        """Walk ahead of playback, paging frames in and queueing them."""
+        loop = 0
+        while not self.stop_event.is_set() and (loops is None or loop < loops):
+            for index in range(len(self.video)):
+                if self.stop_event.is_set():
+                    break
+                self.video.prefetch(index)
+                # (sequence number, frame) so the player can tell how late it is
+                self.frame_queue.put((loop * len(self.video) + index, index))
+            loop += 1
+        self.frame_queue.put(None)
+
+    def play(self, loops=1):
+        """
+        Play the video `loops` times (None loops until stop()). Blocks until
+        done and returns a dict of playback statistics.
+        """
+        self.stop_event.clear()
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        frame_time = 1.0 / self.fps
+
+        self.prefetch_thread = threading.Thread(
+            target=self._prefetch_worker, args=(loops,), daemon=True
+        )
+        self.prefetch_thread.start()
+
+        start = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = self.frame_queue.get(timeout=1.0)
+                except Empty:
+                    continue
+                if item is None:
+                    break
+                sequence, index = item
+
+                # Frame-skip: drop anything whose slot has already passed
+                due = start + sequence * frame_time
+                now = time.monotonic()
+                if now > due + frame_time:
+                    self.frames_skipped += 1
+                    continue
+                if now < due:
+                    time.sleep(due - now)
+
+                self.display.draw_buffer(
+                    self.x,
+                    self.y,
+                    self.video.width,
+                    self.video.height,
+                    self.video.frame(index),
+                )
+                self.frames_shown += 1
+        finally:
+            # Also on errors from the display, so the prefetcher never
+            # outlives playback
+            self.stop_event.set()
+            # Unblock the prefetcher if it is waiting on a full queue
+            while self.prefetch_thread.is_alive():
+                try:
+                    self.frame_queue.get_nowait()
+                except Empty:
+                    time.sleep(0.001)
+            self.prefetch_thread.join()
+            # Drop leftovers so the next play() starts from the first frame
+            while not self.frame_queue.empty():
+                self.frame_queue.get_nowait()
+
+        elapsed = time.monotonic() - start
+        self.achieved_fps = self.frames_shown / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Playback done: {self.frames_shown} shown, "
+            f"{self.frames_skipped} skipped, "
+            f"{self.achieved_fps:.1f} FPS (target {self.fps})"
+        )
+        return {
+            "frames_shown": self.frames_shown,
+            "frames_skipped": self.frames_skipped,
+            "achieved_fps": self.achieved_fps,
+            "elapsed": elapsed,
+        }
+
+    def stop(self):
+        """Stop playback from another thread."""
+        self.stop_event.set()
+
+
+def convert_to_raw(
+    sources, output, width=240, height=320, pixel_format=PixelFormat.RGB565
+):
+    """
+    Convert images or animated GIFs into a raw frame file for RawVideo.
+
+    `sources` is a list of image paths; every frame of a multi-frame image
+    (GIF/APNG) is included. Frames are resized to width x height and packed
+    in `pixel_format`, exactly as the panel expects them on the wire.
+    Returns the frame count.
+    """
+    # Offline tool only; playback does not need Pillow
+    from PIL import Image, ImageSequence
+    import numpy as np
+    from color import pack_pixels, rgb_to_rgb565
+
+    count = 0
+    with open(output, "wb") as out:
+        for source in sources:
+            with Image.open(source) as image:
+                for frame in ImageSequence.Iterator(image):
+                    rgb = frame.convert("RGB").resize((width, height))
+                    pixels = rgb_to_rgb565(np.asarray(rgb))
+                    out.write(pack_pixels(pixels, pixel_format))
+                    count += 1
+    print(f"Wrote {count} frames to {output}")
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Raw RGB565 animation tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="Convert images/GIFs to raw RGB565")
+    convert.add_argument("output")
+    convert.add_argument("sources", nargs="+")
+    convert.add_argument("--width", type=int, default=240)
+    convert.add_argument("--height", type=int, default=320)
+
+    play = sub.add_parser("play", help="Play a raw file or frame directory")
+    play.add_argument("path")
+    play.add_argument("--fps", type=float, default=30)
+    play.add_argument("--loops", type=int, default=1, help="0 loops forever")
+
+    formats = {
+        "16": PixelFormat.RGB565,
+        "18": PixelFormat.RGB666,
+        "12": PixelFormat.RGB444,
+    }
+    for subparser in (convert, play):
+        subparser.add_argument(
+            "--bits", choices=formats, default="16", help="Wire bits per pixel"
+        )
+
+    args = parser.parse_args()
+    pixel_format = formats[args.bits]
+
+    if args.command == "convert":
+        convert_to_raw(args.sources, args.output, args.width, args.height, pixel_format)
+    else:
+        from DisplayHandler import DisplayHandler
+        from GpioHandler import GPIOHandler
+        from SPIHandler import SPIHandler
+        from const import ILI9340
+
+        gpio = GPIOHandler()
+        spi = SPIHandler()
+        display = DisplayHandler(
+            gpio_handler=gpio,
+            spi_handler=spi,
+            commands=ILI9340,
+            pixel_format=pixel_format,
+        )
+        display.init_display(warm=True)
+
+        video = RawVideo(args.path, display.width, display.height, pixel_format)
+        try:
+            VideoPlayer(display, video, fps=args.fps).play(loops=args.loops or None)
+        finally:
+            video.close()
+            spi.close()
+            gpio.cleanup()
@@ -0,0 +1,455 @@
+import threading
+
+import numpy as np
+
+from const import Colors
+from rects import intersect_rects, merge_rects
+
+# Classic 5x7 column font for ASCII 0x20-0x7E; each glyph is 5 column bytes,
+# bit 0 at the top, five glyphs per line. Glyphs are drawn on a 6 px advance.
+FONT_5X7 = bytes.fromhex(
+    "000000000000005f00000007000700147f147f14242a7f2a12"
+    "231308646236495522500005030000001c2241000041221c00"
+    "082a1c2a0808083e0808005030000008080808080060600000"
+    "20100804023e5149453e00427f400042615149462141454b31"
+    "1814127f1027454545393c4a49493001710905033649494936"
+    "064949291e0036360000005636000008142241001414141414"
+    "00412214080201510906324979413e7e1111117e7f49494936"
+    "3e414141227f4141221c7f494949417f090901013e41415132"
+    "7f0808087f00417f41002040413f017f081422417f40404040"
+    "7f0204027f7f0408107f3e4141413e7f090909063e4151215e"
+    "7f09192946464949493101017f01013f4040403f1f2040201f"
+    "7f2018207f63140814630304780403615149454300007f4141"
+    "020408102041417f0000040201020440404040400001020400"
+    "20545454787f484444383844444420384444487f3854545418"
+    "087e090102081454543c7f0804047800447d40002040443d00"
+    "007f10284400417f40007c041804787c080404783844444438"
+    "7c14141408081414187c7c080404084854545420043f444020"
+    "3c4040207c1c2040201c3c4030403c44281028440c5050503c"
+    "4464544c44000836410000007f0000004136080008082a1c08"
+)
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 7
+GLYPH_ADVANCE = 6
+
+
+def text_size(text, scale=1):
+    """Pixel size (width, height) of `text` drawn with the built-in font."""
+    return len(text) * GLYPH_ADVANCE * scale, GLYPH_HEIGHT * scale
+
+
+def render_text(text, scale=1):
+    """Render `text` to a boolean mask, True where a glyph pixel is set."""
+    width, height = text_size(text)
+    mask = np.zeros((height, max(width, 1)), dtype=bool)
+    rows = np.arange(GLYPH_HEIGHT)[:, None]
+    for i, char in enumerate(text):
+        code = ord(char)
+        if not 0x20 <= code <= 0x7E:
+            code = ord("?")
+        start = (code - 0x20) * GLYPH_WIDTH
+        columns = np.frombuffer(
+            FONT_5X7, dtype=np.uint8, count=GLYPH_WIDTH, offset=start
+        )
+        x = i * GLYPH_ADVANCE
+        mask[:, x : x + GLYPH_WIDTH] = (columns[None, :] >> rows) & 1
+    if scale > 1:
+        mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+    return mask
+
+
+class Widget:
+    """
+    Base class for retained-mode widgets.
+
+    A widget renders itself into an RGB565 image of its own size. Changing a
+    property calls invalidate(), which marks only the affected screen area as
+    damaged; Screen.render() redraws just those areas.
+    """
+
+    def __init__(self, x, y, width, height, background=Colors.BLACK):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self._background = background
+        self.visible = True
+        self.screen = None
+        self.z = 0  # Stacking order, assigned by Screen
+        self._image = None  # Cached render, dropped on invalidate
+
+    @property
+    def rect(self):
+        return self.x, self.y, self.width, self.height
+
+    @property
+    def background(self):
+        return self._background
+
+    @background.setter
+    def background(self, value):
+        if value != self._background:
+            self._background = value
+            self.invalidate()
+
+    def contains(self, x, y):
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def invalidate(self, rect=None):
+        """Mark the widget (or a sub-rect in screen coordinates) for redraw."""
+        self._image = None
+        if self.screen is not None:
+            self.screen.invalidate(rect or self.rect)
+
+    def _set_rect(self, rect):
+        """Change position and size; both the old and the new area are redrawn."""
+        if rect == self.rect:
+            return
+        screen = self.screen
+        if screen is None:
+            self.x, self.y, self.width, self.height = rect
+        else:
+            # Under the screen lock, so render() and hit tests running on
+            # another thread never see the widget missing from the grid
+            with screen.lock:
+                old_rect = self.rect
+                screen._unindex(self)
+                self.x, self.y, self.width, self.height = rect
+                screen._index(self)
+                screen.invalidate(old_rect)
+        self.invalidate()
+
+    def move(self, x, y):
+        """Move the widget; both the old and the new area are redrawn."""
+        self._set_rect((x, y, self.width, self.height))
+
+    def resize(self, width, height):
+        """Resize the widget; both the old and the new area are redrawn."""
+        self._set_rect((self.x, self.y, width, height))
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.invalidate()
+
+    def image(self):
+        """Return the widget's RGB565 image, rendering it if needed."""
+        if self._image is None:
+            self._image = np.full(
+                (self.height, self.width), self.background, dtype=np.uint16
+            )
+            self.render(self._image)
+        return self._image
+
+    def render(self, image):
+        """Draw the widget into `image` (already filled with the background)."""
+
+    def on_touch(self, x, y):
+        """Handle a touch at widget-local coordinates."""
+
+
+class Label(Widget):
+    """
+    Single line of text. Without an explicit width (or height) the label
+    resizes to fit its text whenever the text changes.
+    """
+
+    def __init__(
+        self,
+        x,
+        y,
+        text="",
+        color=Colors.WHITE,
+        background=Colors.BLACK,
+        scale=1,
+        width=None,
+        height=None,
+    ):
+        text_w, text_h = text_size(text, scale)
+        super().__init__(x, y, width or text_w, height or text_h, background)
+        self._text = text
+        self._color = color
+        self.scale = scale
+        self.fit_width = width is None
+        self.fit_height = height is None
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value == self._text:
+            return
+        self._text = value
+        text_w, text_h = text_size(value, self.scale)
+        self.resize(
+            text_w if self.fit_width else self.width,
+            text_h if self.fit_height else self.height,
+        )
+        self.invalidate()
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        if value != self._color:
+            self._color = value
+            self.invalidate()
+
+    def render(self, image):
+        mask = render_text(self._text, self.scale)
+        h = min(mask.shape[0], self.height)
+        w = min(mask.shape[1], self.width)
+        image[:h, :w][mask[:h, :w]] = self.color
+
+
+class Button(Label):
+    """Bordered, centered text that calls `on_press(button)` when touched."""
+
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        text="",
+        on_press=None,
+        color=Colors.WHITE,
+        background=Colors.BLACK,
+        border=Colors.WHITE,
+        scale=1,
+    ):
+        super().__init__(
+            x, y, text, color, background, scale, width=width, height=height
+        )
+        self._border = border
+        self.on_press = on_press
+
+    @property
+    def border(self):
+        return self._border
+
+    @border.setter
+    def border(self, value):
+        if value != self._border:
+            self._border = value
+            self.invalidate()
+
+    def render(self, image):
+        image[0, :] = image[-1, :] = self.border
+        image[:, 0] = image[:, -1] = self.border
+
+        mask = render_text(self.text, self.scale)
+        h = min(mask.shape[0], self.height - 2)
+        w = min(mask.shape[1], self.width - 2)
+        top = (self.height - h) // 2
+        left = (self.width - w) // 2
+        image[top : top + h, left : left + w][mask[:h, :w]] = self.color
+
+    def on_touch(self, x, y):
+        if self.on_press:
+            self.on_press(self)
+
+
+class Gauge(Widget):
+    """
+    Horizontal bar gauge.
+
+    Setting `value` damages only the strip between the old and new fill
+    edge, so a small change costs a small write.
+    """
+
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        value=0,
+        minimum=0,
+        maximum=100,
+        color=Colors.GREEN,
+        track=Colors.BLACK,
+    ):
+        super().__init__(x, y, width, height, track)
+        self.minimum = minimum
+        self.maximum = maximum
+        self._color = color
+        self._value = value
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        if value != self._color:
+            self._color = value
+            self.invalidate()
+
+    def _fill_width(self, value):
+        value = max(self.minimum, min(value, self.maximum))
+        span = self.maximum - self.minimum
+        if not span:
+            return 0
+        return int(round((value - self.minimum) * self.width / span))
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        old = self._fill_width(self._value)
+        new = self._fill_width(value)
+        self._value = value
+        if old != new:
+            left = min(old, new)
+            self.invalidate((self.x + left, self.y, abs(new - old), self.height))
+
+    def render(self, image):
+        image[:, : self._fill_width(self._value)] = self.color
+
+
+class Image(Widget):
+    """Static RGB565 image (2-D uint16 array)."""
+
+    def __init__(self, x, y, pixels):
+        pixels = np.asarray(pixels, dtype=np.uint16)
+        super().__init__(x, y, pixels.shape[1], pixels.shape[0])
+        self.pixels = pixels
+
+    def set_pixels(self, pixels):
+        """Replace the image; the widget takes the new array's size."""
+        self.pixels = np.asarray(pixels, dtype=np.uint16)
+        self.resize(self.pixels.shape[1], self.pixels.shape[0])
+        self.invalidate()
+
+    def render(self, image):
+        image[:] = self.pixels[: self.height, : self.width]
+
+
+class Screen:
+    """
+    Root of the widget tree.
+
+    Keeps the damage list, redraws damaged areas with render(), and
+    dispatches touches through a uniform grid so hit testing only looks at
+    the widgets in one cell, however many widgets there are.
+    """
+
+    def __init__(self, display, background=Colors.BLACK, cell_size=32):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        self.background = background
+        self.cell_size = cell_size
+
+        self.widgets = []  # z-order, last is on top
+        self.grid = {}  # (cell_x, cell_y) -> widgets overlapping that cell
+        self.damage = []
+        self.lock = threading.RLock()
+
+    def _cells(self, rect):
+        x, y, w, h = rect
+        size = self.cell_size
+        for cy in range(max(y, 0) // size, (max(y + h, 1) - 1) // size + 1):
+            for cx in range(max(x, 0) // size, (max(x + w, 1) - 1) // size + 1):
+                yield cx, cy
+
+    def _index(self, widget):
+        for cell in self._cells(widget.rect):
+            self.grid.setdefault(cell, []).append(widget)
+
+    def _unindex(self, widget):
+        for cell in self._cells(widget.rect):
+            bucket = self.grid.get(cell)
+            if bucket and widget in bucket:
+                bucket.remove(widget)
+
+    def add(self, widget):
+        """Add a widget on top of the existing ones."""
+        with self.lock:
+            widget.screen = self
+            widget.z = len(self.widgets)
+            self.widgets.append(widget)
+            self._index(widget)
+            widget.invalidate()
+        return widget
+
+    def remove(self, widget):
+        with self.lock:
+            self._unindex(widget)
+            self.widgets.remove(widget)
+            for z, other in enumerate(self.widgets):
+                other.z = z
+            widget.screen = None
+            self.invalidate(widget.rect)
+
+    def invalidate(self, rect=None):
+        """Mark a screen rect (default: everything) for redraw."""
+        bounds = (0, 0, self.width, self.height)
+        rect = intersect_rects(rect or bounds, bounds)
+        if rect:
+            with self.lock:
+                self.damage.append(rect)
+
+    def widget_at(self, x, y):
+        """Topmost visible widget at (x, y), or None."""
+        bucket = self.grid.get((x // self.cell_size, y // self.cell_size), ())
+        hit = None
+        for widget in bucket:
+            if widget.visible and widget.contains(x, y):
+                if hit is None or widget.z > hit.z:
+                    hit = widget
+        return hit
+
+    def handle_touch(self, coordinates):
+        """Touch callback: dispatch to the widget under the touch point."""
+        x, y = coordinates
+        with self.lock:
+            widget = self.widget_at(x, y)
+        if widget is not None:
+            widget.on_touch(x - widget.x, y - widget.y)
+
+    def attach_touch(self, touch):
+        """Route an XPT2046's touch events to this screen's widgets."""
+        touch.set_callback(self.handle_touch)
+
+    def _widgets_in(self, rect):
+        found = set()
+        for cell in self._cells(rect):
+            found.update(self.grid.get(cell, ()))
+        return sorted(found, key=lambda widget: widget.z)
+
+    def render(self):
+        """Redraw the damaged areas. Returns the number of rects written."""
+        with self.lock:
+            rects = merge_rects(self.damage)
+            self.damage = []
+
+            tiles = []
+            for rect in rects:
+                x, y, w, h = rect
+                tile = np.full((h, w), self.background, dtype=np.uint16)
+                for widget in self._widgets_in(rect):
+                    if not widget.visible:
+                        continue
+                    overlap = intersect_rects(rect, widget.rect)
+                    if overlap is None:
+                        continue
+                    ox, oy, ow, oh = overlap
+                    src = widget.image()[
+                        oy - widget.y : oy - widget.y + oh,
+                        ox - widget.x : ox - widget.x + ow,
+                    ]
+                    tile[oy - y : oy - y + oh, ox - x : ox - x + ow] = src
+                tiles.append((x, y, tile))
+
+        # SPI time is spent outside the lock so touches are not held up
+        for x, y, tile in tiles:
+            self.display.blit(x, y, tile)
+        return len(tiles)